@@ -40,7 +40,9 @@ from routes.snaphook import router as snaphook_router
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 checkpoint_path = os.path.join(BASE_DIR, 'checkpoints')
 origins_env = os.getenv("SNAP_ORIGINS", "http://localhost,http://localhost:3000,*")
-origins = origins_env.split(",")
+origins_raw = [o.strip() for o in origins_env.split(",") if o.strip()]
+# A wildcard makes any explicit origins redundant; otherwise drop duplicates and keep order
+origins = ["*"] if "*" in origins_raw else list(dict.fromkeys(origins_raw))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -1,5 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional
+from pathlib import Path
+import orjson
+
+CLUSTER_CACHE_DIR = Path("config/clusterCache")
 
 class ClusterCacheDetails(BaseModel):
     cluster: str
@@ -24,6 +28,20 @@ class ClusterCacheListResponse(BaseModel):
 class ClusterCache(BaseModel):
     cluster_cache_details: ClusterCacheDetails
     
+    @classmethod
+    def load_trusted(cls, path: Path) -> "ClusterCache":
+        """Load a config file written by this service, skipping re-validation."""
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        details = data["cluster_cache_details"]
+        return cls.model_construct(
+            cluster_cache_details=ClusterCacheDetails.model_construct(
+                cluster=details["cluster"],
+                registry=details["registry"],
+                repo=details["repo"]
+            )
+        )
+    
     def to_dict(self):
         return {
             "cluster_cache_details": {
@@ -1,24 +1,51 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, StringConstraints
+from typing import Annotated, NamedTuple
+import orjson
+from pathlib import Path
+from classes.config_cache import load_cached_config
+from flows.helpers import safe_join
+
+# Token with at least one non-whitespace character, checked by the generated core schema
+# rather than a Python validator; the value itself is stored and sent unchanged
+Token = Annotated[str, StringConstraints(pattern=r'\S')]
+
+CLUSTER_CONFIG_DIR = Path("config/clusters")
 
 class ClusterConfigDetails(BaseModel):
     kube_api_url: str
-    token: str
-    
-    @validator('token')
-    def validate_token(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Token is required')
-        return v
+    token: Token
 
 class ClusterConfig(BaseModel):
     cluster_config_details: ClusterConfigDetails
     name: str
 
-    def __init__(self, cluster_config_details: ClusterConfigDetails, name: str):
-        super().__init__(cluster_config_details=cluster_config_details, name=name)
-    
+    @classmethod
+    def load_trusted(cls, path: Path) -> "ClusterConfig":
+        """Load a config file written by this service, skipping re-validation."""
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        details = data["cluster_config_details"]
+        return cls.model_construct(
+            cluster_config_details=ClusterConfigDetails.model_construct(
+                kube_api_url=details["kube_api_url"],
+                # Older config files stored the token as kube_password
+                token=details.get("token", details.get("kube_password", ""))
+            ),
+            name=data["name"]
+        )
+
     def to_dict(self):
         return {
             "cluster_config_details": self.cluster_config_details.model_dump(),
             "name": self.name
         }
+
+class ClusterCredentials(NamedTuple):
+    kube_api_url: str
+    token: str
+
+def load_cluster_credentials(cluster_name: str) -> ClusterCredentials:
+    """Return the API URL and token from a cluster's config file."""
+    path = safe_join(CLUSTER_CONFIG_DIR, f"{cluster_name}.json")
+    details = load_cached_config(path, ClusterConfig).cluster_config_details
+    return ClusterCredentials(details.kube_api_url, details.token)
@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+# Parsed config models keyed by path, invalidated when the file's mtime or size changes
+_config_cache: Dict[Path, Tuple[int, int, Any]] = {}
+
+def load_cached_config(path: Path, model_cls):
+    """Return the parsed config at path, re-reading it only when the file changed.
+
+    model_cls must provide a load_trusted(path) classmethod.
+    """
+    st = os.stat(path)
+    cached = _config_cache.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    config = model_cls.load_trusted(path)
+    _config_cache[path] = (st.st_mtime_ns, st.st_size, config)
+    return config
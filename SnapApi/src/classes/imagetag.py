@@ -1,10 +1,62 @@
-from pydantic import BaseModel, validator
-from typing import Optional
+from dataclasses import dataclass, fields
+from pydantic import BaseModel, field_validator
+from functools import lru_cache
 import re
 
+# <registry>/<repo>/<cluster>-<namespace>-<app>:<origImageShortDigest>-<PodTemplateHash>
+_TAG_RE = re.compile(r'^(.+)/([^/:]+)/([^/:]+)-([^-/:]+)-([^-/:]+):([^:]+)-([^-:]+)$')
 
-class ImageTagComponents(BaseModel):
-    """Model for individual components of an image tag"""
+@dataclass(frozen=True)
+class ImageTagComponents:
+    """Individual components of an image tag (immutable, hashable)"""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10+
+    __slots__ = ('registry', 'repo', 'cluster', 'namespace', 'app', 'origImageShortDigest', 'PodTemplateHash')
+
+    registry: str
+    repo: str
+    cluster: str
+    namespace: str
+    app: str
+    origImageShortDigest: str
+    PodTemplateHash: str
+
+    def __post_init__(self):
+        """Validate components are non-empty strings"""
+        for field in fields(self):
+            v = getattr(self, field.name)
+            if not v or not isinstance(v, str):
+                raise ValueError("All components must be non-empty strings")
+            object.__setattr__(self, field.name, v.strip())
+
+    @classmethod
+    def construct(cls, *values: str) -> "ImageTagComponents":
+        """
+        Build an instance without running __post_init__ validation.
+        Only for callers that guarantee non-empty, stripped strings in field order
+        (e.g. groups of a successful _TAG_RE match).
+        """
+        self = object.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            object.__setattr__(self, name, value)
+        return self
+
+    def dict(self) -> dict:
+        """Compatibility shim for callers written against the pydantic model"""
+        # Fields are flat strings, so skip asdict()'s recursive deepcopy walk
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    # Frozen + __slots__ leaves no __dict__ for copy/pickle to restore into and
+    # blocks their setattr, so (de)serialize the field values explicitly
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+class ImageTagComponentsRequest(BaseModel):
+    """Request body for generating an image tag; errors are reported per field"""
     registry: str
     repo: str
     cluster: str
@@ -13,7 +65,8 @@ class ImageTagComponents(BaseModel):
     origImageShortDigest: str
     PodTemplateHash: str
 
-    @validator('registry', 'repo', 'cluster', 'namespace', 'app', 'origImageShortDigest', 'PodTemplateHash')
+    @field_validator('registry', 'repo', 'cluster', 'namespace', 'app', 'origImageShortDigest', 'PodTemplateHash')
+    @classmethod
     def validate_components(cls, v):
         """Validate components are non-empty strings"""
         if not v or not isinstance(v, str):
@@ -23,13 +76,34 @@ class ImageTagComponents(BaseModel):
 
 
 
-class ImageTagParser(BaseModel):
-    """Parser class for generating and parsing image tags"""
-    
-    def __init__(self):
-        super().__init__()
+@lru_cache(maxsize=4096)
+def _parse_tag_cached(image_tag: str) -> ImageTagComponents:
+    """
+    Parse an image tag into components, memoized per tag string.
+    Instances are frozen, so sharing them between callers is safe;
+    use _parse_tag_cached.cache_clear() to reset.
+    """
+    # One anchored match does all the splitting:
+    # - registry may contain '/' and ':' (ports, nested paths); repo and the
+    #   cluster-namespace-app part may not, so the last ':' starts the tag
+    # - cluster may contain hyphens; namespace and app are the last two '-' fields
+    # - origImageShortDigest may contain hyphens; PodTemplateHash is the last '-' field
+    match = _TAG_RE.match(image_tag)
+    if match is None:
+        raise ValueError(
+            "Invalid image tag format: expected "
+            "<registry>/<repo>/<cluster>-<namespace>-<app>:<origImageShortDigest>-<PodTemplateHash>"
+        )
+    # Every group is non-empty by construction of _TAG_RE, so skip re-validation
+    return ImageTagComponents.construct(*match.groups())
+
+
+
+class ImageTagParser:
+    """Stateless helpers for generating and parsing image tags"""
     
-    def generate_tag(self, components: ImageTagComponents) -> str:
+    @staticmethod
+    def generate_tag(components: ImageTagComponents) -> str:
         """
         Generate image tag from components
         Format: <registry>/<repo>/<cluster>-<namespace>-<app>:<origImageShortDigest>-<PodTemplateHash>
@@ -41,21 +115,17 @@ class ImageTagParser(BaseModel):
             str: Generated image tag
         """
         try:
-            # Validate components
-            components_dict = components.dict()
-            
-            # Build the tag according to the specified format
+            # Build the tag according to the specified format in a single f-string
             # Convert repository portion to lowercase for Docker registry compatibility
-            repo_path = f"{components.cluster}-{components.namespace}-{components.app}".lower()
-            image_part = f"{components.registry}/{components.repo}/{repo_path}"
-            tag_part = f"{components.origImageShortDigest}-{components.PodTemplateHash}"
-            
-            return f"{image_part}:{tag_part}"
+            c = components
+            cluster, namespace, app = c.cluster.lower(), c.namespace.lower(), c.app.lower()
+            return f"{c.registry}/{c.repo}/{cluster}-{namespace}-{app}:{c.origImageShortDigest}-{c.PodTemplateHash}"
             
         except Exception as e:
             raise ValueError(f"Error generating image tag: {str(e)}")
     
-    def parse_tag(self, image_tag: str) -> ImageTagComponents:
+    @staticmethod
+    def parse_tag(image_tag: str) -> ImageTagComponents:
         """
         Parse image tag back to components
         Format: <registry>/<repo>/<cluster>-<namespace>-<app>:<origImageShortDigest>-<PodTemplateHash>
@@ -69,76 +139,12 @@ class ImageTagParser(BaseModel):
         Raises:
             ValueError: If the tag format is invalid
         """
-        try:
-            if not image_tag or not isinstance(image_tag, str):
-                raise ValueError("Image tag must be a non-empty string")
-            
-            # Find the last colon to separate image part from tag part
-            # This handles registries with ports like "192.168.33.204:8082"
-            colon_index = image_tag.rfind(':')
-            if colon_index == -1:
-                raise ValueError("Invalid image tag format: missing ':' separator")
-            
-            image_part = image_tag[:colon_index]
-            tag_part = image_tag[colon_index + 1:]
-            
-            if not image_part or not tag_part:
-                raise ValueError("Invalid image tag format: empty image or tag part")
-            
-            # Parse image part: <registry>/<repo>/<cluster>-<namespace>-<app>
-            image_components = image_part.split('/')
-            if len(image_components) < 3:
-                raise ValueError("Invalid image part format: expected at least 3 components separated by '/'")
-            
-            # Handle case where registry might contain additional slashes (like docker.io/library)
-            # We expect exactly 3 main components: registry, repo, cluster-namespace-app
-            # The last component is cluster-namespace-app, second-to-last is repo, everything before is registry
-            if len(image_components) == 3:
-                registry, repo, cluster_namespace_app = image_components
-            else:
-                # If more than 3 components, assume registry might contain slashes
-                cluster_namespace_app = image_components[-1]
-                repo = image_components[-2]
-                registry = '/'.join(image_components[:-2])
-            
-            # Parse cluster-namespace-app part: <cluster>-<namespace>-<app>
-            # We need to be careful here as cluster, namespace, or app might contain hyphens
-            # We'll assume app is the last component after splitting by '-'
-            cluster_namespace_app_components = cluster_namespace_app.split('-')
-            if len(cluster_namespace_app_components) < 3:
-                raise ValueError("Invalid cluster-namespace-app format: expected at least 3 components separated by '-'")
-            
-            # The app is the last component, namespace is second-to-last, cluster is everything before
-            app = cluster_namespace_app_components[-1]
-            namespace = cluster_namespace_app_components[-2]
-            cluster = '-'.join(cluster_namespace_app_components[:-2])
-            
-            # Parse tag part: <origImageShortDigest>-<PodTemplateHash>
-            tag_components = tag_part.split('-')
-            if len(tag_components) < 2:
-                raise ValueError("Invalid tag part format: expected at least 2 components separated by '-'")
-            
-            # The PodTemplateHash is the last component, origImageShortDigest is everything before
-            PodTemplateHash = tag_components[-1]
-            origImageShortDigest = '-'.join(tag_components[:-1])
-            
-            # Create and return ImageTagComponents object
-            return ImageTagComponents(
-                registry=registry,
-                repo=repo,
-                cluster=cluster,
-                namespace=namespace,
-                app=app,
-                origImageShortDigest=origImageShortDigest,
-                PodTemplateHash=PodTemplateHash
-            )
-            
-        except ValueError:
-            raise
-        except Exception as e:
-            raise ValueError(f"Error parsing image tag: {str(e)}")
+        if not image_tag or not isinstance(image_tag, str):
+            raise ValueError("Image tag must be a non-empty string")
+        return _parse_tag_cached(image_tag)
     
-    def get_component(self, image_tag: str, component_name: str) -> str:
+    @staticmethod
+    def get_component(image_tag: str, component_name: str) -> str:
         """
         Get a specific component from an image tag
         
@@ -157,10 +163,11 @@ class ImageTagParser(BaseModel):
         if component_name not in valid_components:
             raise ValueError(f"Invalid component name. Valid components are: {', '.join(valid_components)}")
         
-        components = self.parse_tag(image_tag)
+        components = ImageTagParser.parse_tag(image_tag)
         return getattr(components, component_name)
     
-    def to_dict(self, image_tag: str) -> dict:
+    @staticmethod
+    def to_dict(image_tag: str) -> dict:
         """
         Convert image tag to dictionary representation
         
@@ -170,7 +177,7 @@ class ImageTagParser(BaseModel):
         Returns:
             dict: Dictionary with all components
         """
-        components = self.parse_tag(image_tag)
+        components = ImageTagParser.parse_tag(image_tag)
         return components.dict()
 
 
@@ -193,8 +200,7 @@ def generate_image_tag(registry: str, repo: str, cluster: str, namespace: str,
         PodTemplateHash=PodTemplateHash
     )
     
-    parser = ImageTagParser()
-    return parser.generate_tag(components)
+    return ImageTagParser.generate_tag(components)
 
 
 def parse_image_tag(image_tag: str) -> dict:
@@ -207,8 +213,7 @@ def parse_image_tag(image_tag: str) -> dict:
     Returns:
         dict: Dictionary with all components
     """
-    parser = ImageTagParser()
-    return parser.to_dict(image_tag)
+    return ImageTagParser.to_dict(image_tag)
 
 
 def get_image_component(image_tag: str, component_name: str) -> str:
@@ -222,5 +227,4 @@ def get_image_component(image_tag: str, component_name: str) -> str:
     Returns:
         str: Value of the requested component
     """
-    parser = ImageTagParser()
-    return parser.get_component(image_tag, component_name)
+    return ImageTagParser.get_component(image_tag, component_name)
@@ -11,13 +11,12 @@ from typing import Optional, Dict, Any
 from classes.apirequests import PodSpecCheckpointRequest
 from classes.clusterconfig import ClusterConfig
 from flows.checkpoint_and_push import checkpoint_and_push_from_pod_spec
-from routes.websocket import broadcast_progress
+from routes.websocket import broadcast_progress, broadcast_progress_many
 from classes.websocket_log_handler import log_info, log_error, log_warning, log_success
 import urllib3
 
 # Suppress urllib3 InsecureRequestWarning for Kubernetes client
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-import threading
 
 # Setup logger for SnapWatcher
 logger = logging.getLogger("automation_api.SnapWatcher")
@@ -67,11 +66,7 @@ class SnapWatcherOperator:
             kube_config.verify_ssl = verify_ssl
             
             if not verify_ssl:
-                # Create SSL context that doesn't verify certificates
-                import ssl
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
+                # verify_ssl=False is all the kubernetes client needs; no CA or client certs
                 kube_config.ssl_ca_cert = None
                 kube_config.cert_file = None
                 kube_config.key_file = None
@@ -155,7 +150,7 @@ class SnapWatcherOperator:
             **kwargs: Additional keyword arguments
         """
         if not self.is_ready():
-            log_warning(logger, 'SnapWatcher', 'Client Status', f'Operator not ready, skipping pod event')
+            log_warning(logger, 'SnapWatcher', 'Client Status', 'Operator not ready, skipping pod event')
             return
             
         evt_type = (event or {}).get("type") or "UNKNOWN"
@@ -175,9 +170,12 @@ class SnapWatcherOperator:
         if status.get("phase") != "Running":
             return
 
-        # Must report Ready=True
-        conds = status.get("conditions", []) or []
-        is_ready = any(c.get("type") == "Ready" and c.get("status") == "True" for c in conds)
+        # Must report Ready=True (the Ready condition is unique, so stop at the first one)
+        is_ready = False
+        for c in status.get("conditions", []) or []:
+            if c.get("type") == "Ready":
+                is_ready = c.get("status") == "True"
+                break
         if not is_ready:
             return
 
@@ -199,8 +197,9 @@ class SnapWatcherOperator:
 
         # Use broadcast for snapWatcher logs - all users will see them
         
-        log_info(logger, 'SnapWatcher', 'Checkpoint Processing', 
-                f'Processing checkpoint request - Event: {evt_type}, Namespace: {ns}, Pod: {pod}, Container: {container_name}, Node: {node_name}, Scope: {self.scope}')
+        log_info(logger, 'SnapWatcher', 'Checkpoint Processing',
+                 'Processing checkpoint request - Event: %s, Namespace: %s, Pod: %s, Container: %s, Node: %s, Scope: %s',
+                 evt_type, ns, pod, container_name, node_name, self.scope)
 
         # -----------------------------------------------------------------
         # Directly call the checkpoint function instead of HTTP request
@@ -215,47 +214,49 @@ class SnapWatcherOperator:
             # Prepare the complete pod specification for the request
             pod_spec_request = PodSpecCheckpointRequest(pod_spec=body)
             
-            log_info(logger, 'SnapWatcher', 'Checkpoint Processing', f'Calling checkpoint function directly for pod {pod} in cluster {self.cluster_name}')
+            log_info(logger, 'SnapWatcher', 'Checkpoint Processing', 'Calling checkpoint function directly for pod %s in cluster %s', pod, self.cluster_name)
             
             # Call the checkpoint function directly
             result = await checkpoint_and_push_from_pod_spec(pod_spec_request, self.cluster_name, "snapwatcher-operator")
             
-            log_info(logger, 'SnapWatcher', 'Checkpoint Processing', f'Checkpoint operation completed: {result.get("success", False)}')
+            log_info(logger, 'SnapWatcher', 'Checkpoint Processing', 'Checkpoint operation completed: %s', result.get("success", False))
             
             if result.get("success"):
-                log_success(logger, 'SnapWatcher', 'Checkpoint Processing', f'Checkpoint and push completed successfully for pod {pod}')
-                log_info(logger, 'SnapWatcher', 'Checkpoint Processing', f'Image tag: {result.get("image_tag", "N/A")}')
+                log_success(logger, 'SnapWatcher', 'Checkpoint Processing', 'Checkpoint and push completed successfully for pod %s', pod)
+                log_info(logger, 'SnapWatcher', 'Checkpoint Processing', 'Image tag: %s', result.get("image_tag", "N/A"))
                 
                 # Automatically delete the pod after successful checkpoint if enabled
                 if self.auto_delete_pod:
-                    await broadcast_progress({
+                    # delete_pod is a single synchronous API call, so both updates go out as one frame
+                    events = [{
                         "progress": 95, 
                         "task_name": "SnapWatcher Checkpoint", 
                         "message": f"Deleting pod {pod} after successful checkpoint"
-                    })
-                    log_info(logger, 'SnapWatcher', 'Pod Management', f'Auto-deleting pod {pod} after successful checkpoint')
+                    }]
+                    log_info(logger, 'SnapWatcher', 'Pod Management', 'Auto-deleting pod %s after successful checkpoint', pod)
                     delete_success = self.delete_pod(pod, ns)
                     if delete_success:
-                        await broadcast_progress({
+                        events.append({
                             "progress": 100, 
                             "task_name": "SnapWatcher Checkpoint", 
                             "message": f"Pod {pod} deleted successfully after checkpoint"
                         })
-                        log_success(logger, 'SnapWatcher', 'Pod Management', f'Pod {pod} deletion initiated successfully')
+                        log_success(logger, 'SnapWatcher', 'Pod Management', 'Pod %s deletion initiated successfully', pod)
                     else:
-                        await broadcast_progress({
+                        events.append({
                             "progress": "failed", 
                             "task_name": "SnapWatcher Checkpoint", 
                             "message": f"Failed to delete pod {pod} after checkpoint"
                         })
-                        log_error(logger, 'SnapWatcher', 'Error Handling', f'Failed to delete pod {pod}')
+                        log_error(logger, 'SnapWatcher', 'Error Handling', 'Failed to delete pod %s', pod)
+                    await broadcast_progress_many(events)
                 else:
                     await broadcast_progress({
                         "progress": 100, 
                         "task_name": "SnapWatcher Checkpoint", 
                         "message": f"Checkpoint completed successfully for pod {pod} (auto-deletion disabled)"
                     })
-                    log_info(logger, 'SnapWatcher', 'Pod Management', f'Auto-deletion disabled, keeping pod {pod}')
+                    log_info(logger, 'SnapWatcher', 'Pod Management', 'Auto-deletion disabled, keeping pod %s', pod)
             else:
                 error_msg = result.get('message', 'Unknown error')
                 await broadcast_progress({
@@ -263,7 +264,7 @@ class SnapWatcherOperator:
                     "task_name": "SnapWatcher Checkpoint", 
                     "message": f"Checkpoint failed for pod {pod}: {error_msg}"
                 })
-                log_error(logger, 'SnapWatcher', 'Error Handling', f'Checkpoint operation failed: {error_msg}')
+                log_error(logger, 'SnapWatcher', 'Error Handling', 'Checkpoint operation failed: %s', error_msg)
                 
         except Exception as e:
             error_msg = f"Unexpected error during checkpoint operation: {str(e)}"
@@ -310,11 +311,12 @@ async def on_pod_event(event, body, logger, **kwargs):
         log_warning(logger, 'SnapWatcher', 'Client Status', f'Operator not initialized, skipping pod event')
         return
     
-    # Namespace filtering for namespace scope
+    # Namespace scope is enforced by the watch itself (kopf.run(namespaces=[...]) in
+    # routes/operator.py); this guard only catches a watch started for another scope
     if operator.scope == "namespace":
         pod_namespace = body.get("metadata", {}).get("namespace", "")
         if pod_namespace != operator.namespace:
-            log_info(logger, 'SnapWatcher', 'Monitoring Setup', f'Skipping pod in namespace {pod_namespace} (watching {operator.namespace})')
+            logger.debug("Skipping pod in namespace %s (watching %s)", pod_namespace, operator.namespace)
             return
     
     await operator.handle_pod_event(event, body, logger, **kwargs)
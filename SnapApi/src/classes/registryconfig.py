@@ -1,9 +1,15 @@
 from pydantic import BaseModel
-import os
-import json 
+from fastapi import HTTPException
+import asyncio
+import orjson
 from flows.proccess_utils import run
+from flows.helpers import safe_join
+from classes.config_cache import load_cached_config
+from pathlib import Path
 from typing import Optional
 
+REGISTRY_CONFIG_DIR = Path("config/registry")
+
 class RegistryConfigDetails(BaseModel):
     registry: str   
     username: str
@@ -13,37 +19,37 @@ class RegistryConfig(BaseModel):
     registry_config_details: RegistryConfigDetails
     name: str
 
-    def __init__(self, registry_config_details: RegistryConfigDetails, name: str):
-        super().__init__(registry_config_details=registry_config_details, name=name)
-    
+    @classmethod
+    def load_trusted(cls, path: Path) -> "RegistryConfig":
+        """Load a config file written by this service, skipping re-validation."""
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        details = data["registry_config_details"]
+        return cls.model_construct(
+            registry_config_details=RegistryConfigDetails.model_construct(
+                registry=details["registry"],
+                username=details["username"],
+                password=details["password"]
+            ),
+            name=data["name"]
+        )
+
     def to_dict(self):
         return {
             "registry_config_details": self.registry_config_details.model_dump(),
             "name": self.name
         }
 
+_REGISTRY_NOT_FOUND = {"success": False, "message": "Registry config not found"}
+
 async def login_to_registry(registry_config_name: str):
     try:
         # Get the registry config details from the config folder
-        path = f"config/registry/{registry_config_name}.json"
-        #check if the file exists
-        if not os.path.exists(path):
-            return {"success": False, "message": "Registry config not found"}
-
-        with open(path, "r") as f:
-            try:
-                data = json.load(f)
-                registry=data["registry_config_details"]["registry"]
-                username=data["registry_config_details"]["username"]
-                password=data["registry_config_details"]["password"]
-                # Create RegistryConfigDetails object first
-                registry_config = RegistryConfigDetails(
-                    registry=registry,
-                    username=username,
-                    password=password
-                )
-            except Exception as e:
-                print(f"Error loading registry config file {registry_config_name}: {e}")
+        path = safe_join(REGISTRY_CONFIG_DIR, f"{registry_config_name}.json")
+        try:
+            registry_config = (await asyncio.to_thread(load_cached_config, path, RegistryConfig)).registry_config_details
+        except FileNotFoundError:
+            return dict(_REGISTRY_NOT_FOUND)
 
         # Login to the registry
         command = [
@@ -51,11 +57,11 @@ async def login_to_registry(registry_config_name: str):
             "login",
             registry_config.registry,
             "--username", registry_config.username,
-            "--password", registry_config.password,
+            "--password-stdin",
             "--tls-verify=false"
         ]
-        # Execute the command using the run helper function
-        await run(command, capture_output=True, text=True, check=True)
+        # Execute the command using the run helper function, passing the password on stdin
+        await run(command, capture_output=True, text=True, check=True, input=(registry_config.password + "\n").encode())
 
         return {"message": f"Successfully logged in to {registry_config.registry}"}
 
@@ -72,28 +78,13 @@ async def login_to_registry(registry_config_name: str):
 
 def get_registry(registry_config_name: str) -> Optional[RegistryConfigDetails]:
     try:
-        path = f"config/registry/{registry_config_name}.json"
-        if not os.path.exists(path):
-            print("Registry config not found")
-            return None
-
-        with open(path, "r") as f:
-            try:
-                data = json.load(f)
-                registry = data["registry_config_details"]["registry"]
-                username = data["registry_config_details"]["username"]
-                password = data["registry_config_details"]["password"]
-
-                return RegistryConfigDetails(
-                    registry=registry,
-                    username=username,
-                    password=password
-                )
-
-            except Exception as e:
-                print(f"Error parsing registry config file {registry_config_name}: {e}")
-                return None
-    except Exception as e:
+        path = safe_join(REGISTRY_CONFIG_DIR, f"{registry_config_name}.json")
+        return load_cached_config(path, RegistryConfig).registry_config_details
+    except FileNotFoundError:
+        print("Registry config not found")
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        # ValueError covers invalid names and malformed JSON; KeyError covers missing fields
         print(f"Error loading registry config file {registry_config_name}: {e}")
         return None
 
@@ -1,89 +1,225 @@
+import re
+import socket
 import ssl
 import tempfile
 import os
+import queue
 import threading
 import logging
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from typing import Dict, Any, Optional
-import json
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import ipaddress
+import orjson
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 
 logger = logging.getLogger(__name__)
 
+# Where the shared webhook certificate is kept across restarts
+SHARED_CERT_DIR = Path(os.getenv('SNAP_CERT_DIR', 'config/certs'))
+# Log every webhook request line (BaseHTTPRequestHandler access log)
+ACCESS_LOG = os.getenv('SNAP_ACCESS_LOG', 'false').lower() == 'true'
+# A persisted certificate closer than this to expiry is regenerated
+CERT_MIN_VALIDITY = timedelta(days=7)
+# Opt-in SO_REUSEPORT on the webhook port. Any process that also sets it can bind the port,
+# and the kernel then splits admissions between processes that may hold different
+# certificates and hooks, so only enable it when every listener shares the same state
+REUSE_PORT = os.getenv('SNAP_WEBHOOK_REUSEPORT', 'false').lower() == 'true'
+# Seconds between checks of the persisted certificate for external renewal; 0 disables
+CERT_RELOAD_INTERVAL = float(os.getenv('SNAP_CERT_RELOAD_INTERVAL', '30'))
+# Subject (and issuer) of the self-signed shared certificate
+_CERT_SUBJECT = x509.Name([
+    x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+    x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "CA"),
+    x509.NameAttribute(NameOID.LOCALITY_NAME, "San Francisco"),
+    x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SnapAPI"),
+    x509.NameAttribute(NameOID.COMMON_NAME, "snaphook.weaversoft.io"),
+])
+
+# Pre-serialized AdmissionReview envelopes for the fallback paths; only uid and message vary
+_NO_HANDLER_RESPONSE = b'{"apiVersion":"admission.k8s.io/v1","kind":"AdmissionReview","response":{"uid":%s,"allowed":true,"status":{"message":%s}}}'
+_ERROR_RESPONSE = b'{"apiVersion":"admission.k8s.io/v1","kind":"AdmissionReview","response":{"uid":%s,"allowed":false,"status":{"message":%s}}}'
+_INTERNAL_ERROR_RESPONSE = b'{"apiVersion":"admission.k8s.io/v1","kind":"AdmissionReview","response":{"allowed":false,"status":{"message":"internal error"}}}'
+
+# Full response head for JSON replies; written together with the body in one sendall
+_JSON_RESPONSE_HEAD = b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+
+# Hook name extraction from webhookConfigurationName / webhookName
+_HOOK_CONFIG_NAME_RE = re.compile(r'snaphook-([^-]*)-')
+_HOOK_WEBHOOK_NAME_RE = re.compile(r'snaphook-([^-.]*)(?=.*\.weaversoft\.io)')
+
+# Reusable request-body buffers; admission reviews for large pod specs run to hundreds of KB
+_READ_BUFFER_SIZE = 64 * 1024
+_MAX_POOLED_BUFFER_SIZE = 1024 * 1024
+_read_buffers: "queue.LifoQueue[bytearray]" = queue.LifoQueue(maxsize=32)
+
+# Upper bound on distinct (webhookConfigurationName, webhookName) pairs remembered per hook set;
+# both names come from the request body, so the cache must not grow with whatever callers send
+HOOK_RESOLVE_CACHE_MAX = 256
+
+
+def _render_admission_response(template: bytes, uid: Any, message: str) -> bytes:
+    """Fill a pre-serialized AdmissionReview template with a JSON-escaped uid and message."""
+    return template % (orjson.dumps(uid), orjson.dumps(message))
+
+def _acquire_read_buffer(size: int) -> bytearray:
+    """Take a pooled request-body buffer of at least size bytes, or allocate one."""
+    try:
+        buf = _read_buffers.get_nowait()
+    except queue.Empty:
+        buf = None
+    if buf is None or len(buf) < size:
+        buf = bytearray(max(size, _READ_BUFFER_SIZE))
+    return buf
+
+def _release_read_buffer(buf: bytearray) -> None:
+    """Return a request-body buffer to the pool unless it is oversized or the pool is full."""
+    if len(buf) <= _MAX_POOLED_BUFFER_SIZE:
+        try:
+            _read_buffers.put_nowait(buf)
+        except queue.Full:
+            pass
+
+def _load_cert_chain_from_pem(ssl_context: ssl.SSLContext, cert_pem: str, key_pem: str) -> None:
+    """
+    Load an in-memory PEM certificate and key into ssl_context.
+    load_cert_chain only accepts paths, so on Linux the PEMs go through anonymous
+    memfd files; elsewhere through temp files that are removed on every exit path.
+    """
+    if hasattr(os, 'memfd_create'):
+        cert_fd = os.memfd_create('shared-webhook-cert')
+        key_fd = os.memfd_create('shared-webhook-key')
+        try:
+            os.write(cert_fd, cert_pem.encode('utf-8'))
+            os.write(key_fd, key_pem.encode('utf-8'))
+            ssl_context.load_cert_chain(f'/proc/self/fd/{cert_fd}', f'/proc/self/fd/{key_fd}')
+        finally:
+            os.close(cert_fd)
+            os.close(key_fd)
+        return
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.crt') as cert_file, \
+            tempfile.NamedTemporaryFile(mode='w', suffix='.key') as key_file:
+        cert_file.write(cert_pem)
+        cert_file.flush()
+        key_file.write(key_pem)
+        key_file.flush()
+        ssl_context.load_cert_chain(cert_file.name, key_file.name)
+
+def _build_server_context(cert_pem: str, key_pem: str) -> ssl.SSLContext:
+    """Build a server SSLContext with the webhook TLS settings for one certificate."""
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+    ssl_context.options &= ~ssl.OP_NO_TICKET
+    ssl_context.set_ciphers('ECDHE+AESGCM:ECDHE+CHACHA20')
+    _load_cert_chain_from_pem(ssl_context, cert_pem, key_pem)
+    return ssl_context
+
 class SharedWebhookHandler(BaseHTTPRequestHandler):
     """Webhook handler for the shared HTTPS server."""
     
+    # Bound by SharedHTTPServerManager._create_shared_webhook_handler before serving
+    server_manager: Optional["SharedHTTPServerManager"] = None
+    
+    # Keep apiserver connections open between admission reviews to skip repeated TLS handshakes
+    protocol_version = "HTTP/1.1"
+    # Drop idle keep-alive connections instead of holding a worker indefinitely
+    timeout = 5
+    
     def log_message(self, format, *args):
-        logger.info(f"Shared HTTPS Server: {format % args}")
+        # Per-request access log line; off unless SNAP_ACCESS_LOG=true
+        if ACCESS_LOG and logger.isEnabledFor(logging.INFO):
+            logger.info("Shared HTTPS Server: " + format, *args)
+    
+    def log_error(self, format, *args):
+        # BaseHTTPRequestHandler routes errors through log_message; keep them regardless of ACCESS_LOG
+        logger.error("Shared HTTPS Server: " + format, *args)
     
     def do_POST(self):
         try:
-            # Read request body
+            # Read request body into a pooled buffer
             content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
+            buf = _acquire_read_buffer(content_length)
             try:
-                body = json.loads(post_data.decode('utf-8'))
-            except json.JSONDecodeError:
-                self.send_error(400, "Invalid JSON")
-                return
+                post_data = memoryview(buf)[:content_length]
+                received = 0
+                while received < content_length:
+                    n = self.rfile.readinto(post_data[received:])
+                    if not n:
+                        break
+                    received += n
+                
+                # Parse JSON (orjson reads the buffer directly, no copy or decode step)
+                try:
+                    body = orjson.loads(post_data[:received])
+                except orjson.JSONDecodeError:
+                    self.send_error(400, "Invalid JSON")
+                    return
+            finally:
+                _release_read_buffer(buf)
             
             # Route to appropriate hook handler
             response = self._route_to_hook(body)
             
-            # Send response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            # Fallback paths return already-serialized bytes
+            response_bytes = response if isinstance(response, bytes) else orjson.dumps(response)
             
-        except Exception as e:
-            logger.error(f"Error in shared webhook handler: {e}")
-            self.send_error(500, str(e))
+            # Send response; Content-Length is required for HTTP/1.1 keep-alive
+            self._send_json(200, response_bytes)
+            
+        except Exception:
+            logger.exception("Error in shared webhook handler")
+            # JSON for the apiserver instead of send_error's HTML page
+            self._send_json(500, _INTERNAL_ERROR_RESPONSE)
+    
+    def _send_json(self, code: int, body: bytes):
+        """
+        Write status line, headers and body with a single write.
+        wfile is unbuffered, so send_response/end_headers plus a body write
+        would cost two sendall calls (and two TLS records) per response.
+        """
+        self.log_request(code)
+        reason = self.responses[code][0].encode('latin-1')
+        self.wfile.write(_JSON_RESPONSE_HEAD % (code, reason, len(body)) + body)
     
     def _route_to_hook(self, body):
         """Route webhook request to the appropriate hook handler."""
         try:
+            server_manager = self.server_manager
+            
             # Extract hook information from the request
             hook_name = self._determine_hook_from_request(body)
             
-            if hook_name and hasattr(self, 'server_manager') and hook_name in self.server_manager.hook_handlers:
-                handler_info = self.server_manager.hook_handlers[hook_name]
+            handler_info = server_manager.hook_handlers.get(hook_name) if server_manager is not None and hook_name else None
+            if handler_info is not None:
                 return handler_info['handler'](body)
             else:
                 # Log available handlers for debugging
-                if hasattr(self, 'server_manager'):
-                    available_handlers = list(self.server_manager.hook_handlers.keys())
-                    logger.warning(f"No handler found for hook: {hook_name}. Available handlers: {available_handlers}")
+                if server_manager is not None:
+                    if logger.isEnabledFor(logging.WARNING):
+                        logger.warning("No handler found for hook: %s. Available handlers: %s", hook_name, list(server_manager.hook_handlers))
                 else:
                     logger.warning("No server manager available")
                 
                 # Default handling or error
-                return {
-                    "apiVersion": "admission.k8s.io/v1",
-                    "kind": "AdmissionReview",
-                    "response": {
-                        "uid": body.get("request", {}).get("uid", ""),
-                        "allowed": True,
-                        "status": {
-                            "message": f"No handler found for hook: {hook_name}"
-                        }
-                    }
-                }
+                return _render_admission_response(
+                    _NO_HANDLER_RESPONSE,
+                    body.get("request", {}).get("uid", ""),
+                    f"No handler found for hook: {hook_name}"
+                )
                 
         except Exception as e:
             logger.error(f"Error routing to hook: {e}")
-            return {
-                "apiVersion": "admission.k8s.io/v1",
-                "kind": "AdmissionReview",
-                "response": {
-                    "uid": body.get("request", {}).get("uid", ""),
-                    "allowed": False,
-                    "status": {
-                        "message": f"Error processing webhook: {str(e)}"
-                    }
-                }
-            }
+            return _render_admission_response(
+                _ERROR_RESPONSE,
+                body.get("request", {}).get("uid", ""),
+                f"Error processing webhook: {str(e)}"
+            )
     
     def _determine_hook_from_request(self, body):
         """Determine which hook should handle this request."""
@@ -95,37 +231,81 @@ class SharedWebhookHandler(BaseHTTPRequestHandler):
             if "webhook" in request:
                 return request["webhook"]
             
-            # Method 2: Check the webhook configuration name from the request
-            # This comes from the Kubernetes webhook configuration
-            webhook_config_name = request.get("webhookConfigurationName")
-            if webhook_config_name:
-                # Extract hook name from webhook config name (format: snaphook-{hook_name}-{cluster_name})
-                if webhook_config_name.startswith("snaphook-"):
-                    parts = webhook_config_name.split("-")
-                    if len(parts) >= 3:
-                        hook_name = parts[1]  # Extract the hook name
-                        if hasattr(self, 'server_manager') and hook_name in self.server_manager.hook_handlers:
-                            return hook_name
+            server_manager = self.server_manager
+            if server_manager is None:
+                return None
             
-            # Method 3: Check the webhook name from the admission request
-            webhook_name = request.get("webhookName")
-            if webhook_name:
-                # Extract hook name from webhook name (format: snaphook-{hook_name}.weaversoft.io)
-                if webhook_name.startswith("snaphook-") and ".weaversoft.io" in webhook_name:
-                    hook_name = webhook_name.split("-")[1].split(".")[0]
-                    if hasattr(self, 'server_manager') and hook_name in self.server_manager.hook_handlers:
-                        return hook_name
-            
-            # Method 4: For backward compatibility, use the first available hook
-            if hasattr(self, 'server_manager') and self.server_manager.hook_handlers:
-                available_hooks = list(self.server_manager.hook_handlers.keys())
-                return available_hooks[0]
-            
-            return None
+            # Methods 2-4 only depend on these two names and the registered hooks,
+            # so resolve each distinct pair once until the hooks change
+            key = (request.get("webhookConfigurationName") or "", request.get("webhookName") or "")
+            # Read the cache before hook_handlers; register/unregister swap them in the other order
+            cache = server_manager._hook_resolve_cache
+            hook_name = cache.get(key)
+            if hook_name is None:
+                hook_name = self._resolve_hook_name(server_manager.hook_handlers, *key)
+                # Misses are not cached, and once full the cache only serves the pairs it already holds
+                if hook_name is not None and len(cache) < HOOK_RESOLVE_CACHE_MAX:
+                    cache[key] = hook_name
+            return hook_name
             
         except Exception as e:
             logger.error(f"Error determining hook from request: {e}")
             return None
+    
+    @staticmethod
+    def _resolve_hook_name(hook_handlers, webhook_config_name, webhook_name):
+        """Resolve a hook name from the webhook configuration/webhook names."""
+        # Method 2: Check the webhook configuration name from the request
+        # This comes from the Kubernetes webhook configuration
+        # Format: snaphook-{hook_name}-{cluster_name}
+        match = _HOOK_CONFIG_NAME_RE.match(webhook_config_name)
+        if match and match.group(1) in hook_handlers:
+            return match.group(1)
+        
+        # Method 3: Check the webhook name from the admission request
+        # Format: snaphook-{hook_name}.weaversoft.io
+        match = _HOOK_WEBHOOK_NAME_RE.match(webhook_name)
+        if match and match.group(1) in hook_handlers:
+            return match.group(1)
+        
+        # Method 4: For backward compatibility, use the first available hook
+        if hook_handlers:
+            return next(iter(hook_handlers))
+        
+        return None
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer that hands connections to a bounded worker pool
+    instead of spawning one thread per connection.
+    """
+    
+    daemon_threads = True
+    # Deeper accept backlog for admission bursts
+    request_queue_size = 128
+    
+    def __init__(self, server_address, handler_class, max_workers: int):
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shared-webhook")
+    
+    def server_bind(self):
+        # SO_REUSEADDR comes from HTTPServer.allow_reuse_address; SO_REUSEPORT only on request
+        if REUSE_PORT and hasattr(socket, 'SO_REUSEPORT'):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+    
+    def get_request(self):
+        # Responses are small single writes; don't let Nagle hold them back
+        conn, addr = self.socket.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn, addr
+    
+    def process_request(self, request, client_address):
+        self._executor.submit(self.process_request_thread, request, client_address)
+    
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
 
 class SharedHTTPServerManager:
     """
@@ -140,36 +320,86 @@ class SharedHTTPServerManager:
         self.cert_data: Optional[Dict[str, str]] = None
         self.ca_bundle: Optional[str] = None
         self.hook_handlers: Dict[str, Any] = {}  # hook_name -> handler info
+        # (webhookConfigurationName, webhookName) -> resolved hook name; replaced whenever hooks change
+        self._hook_resolve_cache: Dict[Tuple[str, str], str] = {}
         self._lock = threading.Lock()
+        self._started = threading.Event()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._ssl_context_cert: Optional[str] = None
+        self._cert_watch_stop = threading.Event()
+        self._cert_watch_thread: Optional[threading.Thread] = None
     
     def generate_shared_certificates(self) -> Dict[str, str]:
         """
-        Generate shared self-signed certificates for all hooks.
+        Get the shared self-signed certificates for all hooks.
+        Reuses the in-process certificate, then a persisted one that is not about
+        to expire, and only generates a new key pair when neither is available.
+        Set SNAP_FORCE_REGEN_CERTS=true to always generate.
         
         Returns:
             Dict containing certificate data
         """
-        from cryptography import x509
-        from cryptography.x509.oid import NameOID
-        from cryptography.hazmat.primitives import hashes, serialization
-        from cryptography.hazmat.primitives.asymmetric import rsa
-        from datetime import datetime, timedelta
-        import ipaddress
+        force_regen = os.getenv('SNAP_FORCE_REGEN_CERTS', 'false').lower() == 'true'
+        if not force_regen:
+            if self.cert_data:
+                return self.cert_data
+            cert_data = self._load_persisted_certificates()
+            if cert_data:
+                logger.info(f"Reusing shared certificate from {SHARED_CERT_DIR}")
+                return cert_data
         
-        # Generate private key
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-        )
+        cert_data = self._create_certificates()
+        self._persist_certificates(cert_data)
+        return cert_data
+    
+    def _load_persisted_certificates(self) -> Optional[Dict[str, str]]:
+        """Load the persisted certificate if it exists and is valid for at least CERT_MIN_VALIDITY."""
+        try:
+            cert_pem = (SHARED_CERT_DIR / "shared.crt").read_text()
+            key_pem = (SHARED_CERT_DIR / "shared.key").read_text()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read persisted shared certificate: {e}")
+            return None
+        
+        try:
+            cert = x509.load_pem_x509_certificate(cert_pem.encode('utf-8'))
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid persisted shared certificate: {e}")
+            return None
+        # not_valid_after_utc is cryptography>=42; older versions return a naive UTC datetime
+        not_valid_after = getattr(cert, 'not_valid_after_utc', None) or cert.not_valid_after.replace(tzinfo=timezone.utc)
+        if not_valid_after - datetime.now(timezone.utc) < CERT_MIN_VALIDITY:
+            return None
+        
+        return {
+            "cert": cert_pem,
+            "key": key_pem,
+            "cert_data": cert_pem,
+            "key_data": key_pem
+        }
+    
+    def _persist_certificates(self, cert_data: Dict[str, str]) -> None:
+        """Persist the certificate and key so restarts keep the same CA bundle."""
+        try:
+            SHARED_CERT_DIR.mkdir(parents=True, exist_ok=True)
+            for name, content, mode in (("shared.crt", cert_data["cert"], 0o644), ("shared.key", cert_data["key"], 0o600)):
+                path = SHARED_CERT_DIR / name
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                os.chmod(path, mode)
+        except OSError as e:
+            logger.warning(f"Could not persist shared certificate to {SHARED_CERT_DIR}: {e}")
+    
+    def _create_certificates(self) -> Dict[str, str]:
+        """Generate a new self-signed certificate and private key."""
+        # Generate private key (ECDSA P-256: cheap to generate and to sign handshakes with)
+        private_key = ec.generate_private_key(ec.SECP256R1())
         
         # Create certificate
-        subject = issuer = x509.Name([
-            x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
-            x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "CA"),
-            x509.NameAttribute(NameOID.LOCALITY_NAME, "San Francisco"),
-            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SnapAPI"),
-            x509.NameAttribute(NameOID.COMMON_NAME, "snaphook.weaversoft.io"),
-        ])
+        subject = issuer = _CERT_SUBJECT
         
         # Add Subject Alternative Names
         san_list = [
@@ -184,6 +414,7 @@ class SharedHTTPServerManager:
         except:
             pass
         
+        now = datetime.now(timezone.utc)
         cert = x509.CertificateBuilder().subject_name(
             subject
         ).issuer_name(
@@ -193,9 +424,9 @@ class SharedHTTPServerManager:
         ).serial_number(
             x509.random_serial_number()
         ).not_valid_before(
-            datetime.utcnow()
+            now
         ).not_valid_after(
-            datetime.utcnow() + timedelta(days=365)
+            now + timedelta(days=365)
         ).add_extension(
             x509.SubjectAlternativeName(san_list),
             critical=False,
@@ -233,53 +464,149 @@ class SharedHTTPServerManager:
                 self.cert_data = self.generate_shared_certificates()
                 self.ca_bundle = self.cert_data["cert"]
                 
-                # Create SSL context
-                ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                ssl_context = self._get_ssl_context()
                 
-                # Create temporary files for certificates
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.crt', delete=False) as f:
-                    f.write(self.cert_data["cert_data"])
-                    cert_file = f.name
+                # Create HTTPS server with shared handler
+                handler = self._create_shared_webhook_handler()
+                # Serve admissions concurrently so one slow hook does not stall the rest
+                max_workers = int(os.getenv('SNAPHOOK_WEBHOOK_WORKERS', '16'))
+                self.https_server = PooledHTTPServer(('0.0.0.0', 8443), handler, max_workers)
+                self.https_server.socket = ssl_context.wrap_socket(
+                    self.https_server.socket, 
+                    server_side=True
+                )
                 
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.key', delete=False) as f:
-                    f.write(self.cert_data["key_data"])
-                    key_file = f.name
+                # Start server in background thread
+                self._started.clear()
+                self.server_thread = threading.Thread(target=self._run_server, daemon=True)
+                self.server_thread.start()
                 
-                try:
-                    ssl_context.load_cert_chain(cert_file, key_file)
-                    
-                    # Create HTTPS server with shared handler
-                    handler = self._create_shared_webhook_handler()
-                    self.https_server = HTTPServer(('0.0.0.0', 8443), handler)
-                    self.https_server.socket = ssl_context.wrap_socket(
-                        self.https_server.socket, 
-                        server_side=True
-                    )
-                    
-                    # Start server in background thread
-                    self.server_thread = threading.Thread(target=self._run_server, daemon=True)
-                    self.server_thread.start()
-                    
-                    # Wait a moment for server to start
-                    import time
-                    time.sleep(1)
-                    
-                    self.is_running = True
-                    logger.info("Shared HTTPS server started on port 8443")
-                    return True
-                    
-                finally:
-                    # Clean up temporary files
-                    os.unlink(cert_file)
-                    os.unlink(key_file)
+                # The socket is already listening; wait only until the serving thread is up
+                if not self._started.wait(timeout=5):
+                    logger.warning("Shared HTTPS server thread did not signal startup within 5s")
+                
+                self.is_running = True
+                self._start_certificate_watch()
+                logger.info("Shared HTTPS server started on port 8443")
+                return True
                     
             except Exception as e:
                 logger.error(f"Failed to start shared HTTPS server: {e}")
                 return False
     
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        """
+        Return the server SSLContext, building it only when the certificate changed.
+        Reusing one context across start/stop keeps its session ticket keys, so
+        apiserver clients can resume sessions with abbreviated handshakes. The
+        listening socket keeps its original context; handshakes are moved onto the
+        current one by _select_certificate.
+        """
+        if self._ssl_context is None or self._ssl_context_cert != self.cert_data["cert_data"]:
+            ssl_context = _build_server_context(self.cert_data["cert_data"], self.cert_data["key_data"])
+            ssl_context.sni_callback = self._select_certificate
+            self._ssl_context = ssl_context
+            self._ssl_context_cert = self.cert_data["cert_data"]
+        return self._ssl_context
+    
+    def _select_certificate(self, ssl_socket, server_name, initial_context):
+        """
+        SNI callback: move the handshake onto the current shared certificate.
+        Every hook is served the same certificate, so server_name is not consulted;
+        the callback only lets a reloaded context take effect on the next connection
+        without rebinding the listener.
+        """
+        ssl_context = self._ssl_context
+        if ssl_context is not None and ssl_context is not initial_context:
+            ssl_socket.context = ssl_context
+        return None
+    
+    def reload_certificates(self, cert_pem: str, key_pem: str):
+        """
+        Replace the shared certificate without restarting the listener.
+        New handshakes use it immediately; established connections are unaffected.
+        The certificate is self-signed and doubles as the CA bundle, so every
+        registered hook is then asked to re-push its webhook configuration.
+        
+        Args:
+            cert_pem: PEM-encoded certificate chain
+            key_pem: PEM-encoded private key
+        """
+        ssl_context = _build_server_context(cert_pem, key_pem)
+        ssl_context.sni_callback = self._select_certificate
+        with self._lock:
+            self.cert_data = {
+                "cert": cert_pem,
+                "key": key_pem,
+                "cert_data": cert_pem,
+                "key_data": key_pem
+            }
+            self.ca_bundle = cert_pem
+            self._ssl_context = ssl_context
+            self._ssl_context_cert = cert_pem
+            hook_handlers = self.hook_handlers
+        logger.info("Reloaded shared HTTPS server certificate")
+        
+        # Outside the lock: callbacks call the Kubernetes API and may take a while
+        for hook_name, handler_info in hook_handlers.items():
+            on_cert_reload = handler_info.get('on_cert_reload')
+            if on_cert_reload is None:
+                continue
+            try:
+                on_cert_reload()
+            except Exception as e:
+                logger.error(f"Failed to update CA bundle for hook {hook_name} after certificate reload: {e}")
+    
+    def _start_certificate_watch(self):
+        """Start polling the persisted certificate for renewal by an external issuer."""
+        if CERT_RELOAD_INTERVAL <= 0:
+            return
+        # Each watcher gets its own stop event. A watcher from before a quick stop()/start()
+        # may still be finishing a tick; it exits on its own (set) event instead of being
+        # mistaken for the live one, and can never be revived by clearing a shared flag.
+        self._cert_watch_stop.set()
+        self._cert_watch_stop = threading.Event()
+        self._cert_watch_thread = threading.Thread(
+            target=self._watch_certificates, args=(self._cert_watch_stop,), daemon=True
+        )
+        self._cert_watch_thread.start()
+    
+    def _watch_certificates(self, stop: threading.Event):
+        """
+        Reload the shared certificate when the persisted files change.
+        Only the file mtime is checked each interval; the PEMs are read and parsed
+        only after a change, and a half-written pair is retried on the next tick.
+        """
+        cert_path = SHARED_CERT_DIR / "shared.crt"
+        
+        def _mtime():
+            try:
+                return os.stat(cert_path).st_mtime_ns
+            except OSError:
+                return None
+        
+        last_mtime = _mtime()
+        while not stop.wait(CERT_RELOAD_INTERVAL):
+            mtime = _mtime()
+            if mtime is None or mtime == last_mtime:
+                continue
+            cert_data = self._load_persisted_certificates()
+            if cert_data is None:
+                continue
+            if self.cert_data and cert_data["cert_data"] == self.cert_data["cert_data"]:
+                last_mtime = mtime
+                continue
+            try:
+                self.reload_certificates(cert_data["cert_data"], cert_data["key_data"])
+            except (ssl.SSLError, OSError) as e:
+                logger.warning(f"Could not reload renewed shared certificate, retrying: {e}")
+                continue
+            last_mtime = mtime
+    
     def _run_server(self):
         """Run the HTTPS server in the background thread."""
         try:
+            self._started.set()
             self.https_server.serve_forever()
         except Exception as e:
             logger.error(f"Shared HTTPS server error: {e}")
@@ -292,19 +619,28 @@ class SharedHTTPServerManager:
         SharedWebhookHandler.server_manager = self
         return SharedWebhookHandler
     
-    def register_hook_handler(self, hook_name: str, handler_func):
+    def register_hook_handler(self, hook_name: str, handler_func, on_cert_reload=None):
         """
         Register a hook handler with the shared server.
         
         Args:
             hook_name: Unique name for the hook
             handler_func: Function to handle webhook requests for this hook
+            on_cert_reload: Optional callable run after the shared certificate is
+                reloaded, to push the new CA bundle to the hook's webhook configuration
         """
         with self._lock:
-            self.hook_handlers[hook_name] = {
+            # Copy-on-write: request threads read hook_handlers without the lock, so
+            # publish a new dict instead of mutating the one they may be iterating.
+            # Swap handlers before the resolve cache; readers fetch the cache first.
+            hook_handlers = dict(self.hook_handlers)
+            hook_handlers[hook_name] = {
                 'handler': handler_func,
+                'on_cert_reload': on_cert_reload,
                 'registered_at': threading.current_thread().ident
             }
+            self.hook_handlers = hook_handlers
+            self._hook_resolve_cache = {}
             logger.info(f"Registered hook handler: {hook_name}")
     
     def unregister_hook_handler(self, hook_name: str):
@@ -316,7 +652,10 @@ class SharedHTTPServerManager:
         """
         with self._lock:
             if hook_name in self.hook_handlers:
-                del self.hook_handlers[hook_name]
+                hook_handlers = dict(self.hook_handlers)
+                del hook_handlers[hook_name]
+                self.hook_handlers = hook_handlers
+                self._hook_resolve_cache = {}
                 logger.info(f"Unregistered hook handler: {hook_name}")
     
     def stop_shared_server(self) -> bool:
@@ -332,6 +671,7 @@ class SharedHTTPServerManager:
                 return True
             
             try:
+                self._cert_watch_stop.set()
                 if self.https_server:
                     self.https_server.shutdown()
                     self.https_server.server_close()
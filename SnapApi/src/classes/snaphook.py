@@ -7,19 +7,27 @@ import os
 import ssl
 import base64
 import logging
-import subprocess
-import tempfile
+import traceback
 import threading
+import time
 import asyncio
+import concurrent.futures
 import warnings
-from typing import Dict, Any, Optional
-from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import json
+from types import MappingProxyType
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urlsplit
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from kubernetes import client
 from kubernetes.client.rest import ApiException
 import urllib3
-from classes.websocket_log_handler import log_info, log_error, log_warning, log_success
+from classes.websocket_log_handler import log_info, log_error, log_success
+from classes.imagetag import generate_image_tag
+from flows.helpers import (
+    extract_app_name_from_pod, extract_digest,
+    get_snap_config_from_cluster_cache_api, check_image_exists_multi_registry
+)
 
 # Suppress urllib3 InsecureRequestWarning for Kubernetes client
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -32,6 +40,113 @@ except ImportError:
 
 logger = logging.getLogger("automation_api.SnapHook")
 
+# Seconds hooks reuse a cluster's cache registry/repo before asking the API again
+SNAP_CONFIG_TTL = 30.0
+# cluster name -> (fetched_at, snap config); dropped early by invalidate_snap_config_cache
+_SNAP_CONFIG_CACHE: Dict[str, Tuple[float, Dict[str, str]]] = {}
+
+# Registry existence results per hook: hits are stable, misses clear once the snapshot is pushed
+IMAGE_EXISTS_TTL = 60.0
+IMAGE_MISSING_TTL = 10.0
+IMAGE_EXISTS_CACHE_MAX = 4096
+
+# Source image ref -> (expires_at, short digest), shared by all hooks; tags can move, so entries expire
+_DIGEST_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+DIGEST_CACHE_TTL = 300.0
+DIGEST_CACHE_MAX = 4096
+
+
+# Upper bound for one admission review; the apiserver gives up after at most 30s anyway
+WEBHOOK_PROCESSING_TIMEOUT = 30.0
+# Threads the shared loop lends to blocking I/O (registry probes); matches the registry connection pool
+WEBHOOK_IO_WORKERS = 32
+
+# Read-only stand-in for missing sections of the admission request; avoids a new dict per miss
+_EMPTY_DICT = MappingProxyType({})
+
+# JSONPatch op marking a pod as mutated; "add" since the webhook only sees pods without the label
+_MUTATED_LABEL_PATCH = orjson.dumps({
+    "op": "add",
+    "path": "/metadata/labels/snap.weaversoft.io~1mutated",
+    "value": "true"
+})
+
+# Shared head of every AdmissionReview response; uid is filled per request
+_RESPONSE_PREFIX = b'{"apiVersion":"admission.k8s.io/v1","kind":"AdmissionReview","response":{"uid":%s,'
+
+_webhook_loop: Optional[asyncio.AbstractEventLoop] = None
+_webhook_loop_lock = threading.Lock()
+
+
+def _json_string_body(value: Any) -> bytes:
+    """JSON-escape value as a string, without the surrounding quotes."""
+    return orjson.dumps(str(value))[1:-1]
+
+
+def _get_webhook_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop shared by all SnapHook handlers, starting its thread on first use."""
+    global _webhook_loop
+    with _webhook_loop_lock:
+        if _webhook_loop is None:
+            loop = asyncio.new_event_loop()
+            # Bounded so a burst of probes queues for pooled connections instead of spawning threads
+            loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(
+                max_workers=WEBHOOK_IO_WORKERS, thread_name_prefix="snaphook-io"
+            ))
+            threading.Thread(target=loop.run_forever, name="snaphook-webhook-loop", daemon=True).start()
+            _webhook_loop = loop
+    return _webhook_loop
+
+
+def invalidate_snap_config_cache(cluster_name: Optional[str] = None) -> None:
+    """
+    Forget the cached cluster cache config for cluster_name, or for every cluster.
+    Called when a cluster cache config is changed so hooks pick it up on their next admission.
+    """
+    if cluster_name is None:
+        _SNAP_CONFIG_CACHE.clear()
+    else:
+        _SNAP_CONFIG_CACHE.pop(cluster_name, None)
+
+
+def _run_on_webhook_loop(coro, timeout: float = WEBHOOK_PROCESSING_TIMEOUT):
+    """
+    Run coro on the shared webhook loop and wait for its result from a plain thread.
+    Must not be called from the loop thread itself.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_webhook_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def _url_host(url: str, default: str = "localhost") -> str:
+    """Hostname of url, without scheme, port or path; bare host[:port] values work too."""
+    return urlsplit(url if "://" in url else "//" + url).hostname or default
+
+
+@lru_cache(maxsize=8192)
+def _cached_image_tag(registry: str, repo: str, cluster: str, namespace: str,
+                      app: str, orig_digest: str, pod_hash: str) -> str:
+    """Image tag for the given components; replicas of one rollout all share an entry."""
+    return generate_image_tag(
+        registry=registry,
+        repo=repo,
+        cluster=cluster,
+        namespace=namespace,
+        app=app,
+        origImageShortDigest=orig_digest,
+        PodTemplateHash=pod_hash
+    )
+
+
+@lru_cache(maxsize=8)
+def _encode_ca_bundle(ca_pem: str) -> str:
+    """Base64 form of a PEM CA bundle for webhook clientConfig; every hook shares the same bundle."""
+    return base64.b64encode(ca_pem.encode('utf-8')).decode('ascii')
+
 
 class SnapHook:
     """
@@ -62,6 +177,11 @@ class SnapHook:
         self.cluster_config = cluster_config
         self.namespace = namespace
         self.cert_expiry_days = cert_expiry_days
+        self._build_response_templates()
+        # (registry, repo, cluster, namespace, app, digest, pod_hash) -> (expires_at, exists), oldest first
+        self._image_exists_cache: "OrderedDict[Tuple[str, ...], Tuple[float, bool]]" = OrderedDict()
+        # ((webhook_url, ca_bundle), serialized MutatingWebhookConfiguration); see _webhook_configuration_body
+        self._webhook_body_cache: Optional[Tuple[Tuple[str, str], Dict[str, Any]]] = None
         # Auto-generate webhook URL from SNAP_API_URL if not provided
         if webhook_url:
             self.webhook_url = webhook_url
@@ -84,23 +204,12 @@ class SnapHook:
         Returns:
             Generated webhook URL
         """
-        import os
         snap_api_url = os.getenv("SNAP_API_URL", "http://localhost:8000")
         
-        # Extract host and port from SNAP_API_URL
-        if snap_api_url.startswith("http://"):
-            host_port = snap_api_url.replace("http://", "")
-        elif snap_api_url.startswith("https://"):
-            host_port = snap_api_url.replace("https://", "")
-        else:
-            host_port = snap_api_url
-        
-        # Split host and port
-        if ":" in host_port:
-            host, port = host_port.split(":", 1)
-        else:
-            host = host_port
-            port = "8000"  # Default API port
+        # Extract host from SNAP_API_URL (IPv6 literals need their brackets back)
+        host = _url_host(snap_api_url)
+        if ":" in host:
+            host = f"[{host}]"
         
         # Use port 8443 for webhook (SnapHook HTTPS server port)
         webhook_url = f"https://{host}:8443/mutate"
@@ -137,168 +246,6 @@ class SnapHook:
             log_error(logger, 'SnapHook', 'Error Handling', f'Could not setup Kubernetes configuration: {e}')
             raise
     
-    def _generate_self_signed_certificates(self) -> Dict[str, str]:
-        """
-        Generate self-signed certificates for HTTPS webhook.
-        
-        Returns:
-            Dict containing certificate data
-        """
-        try:
-            log_info(logger, 'SnapHook', 'Certificate Generation', f'Generating self-signed certificates...')
-            
-            # Create temporary directory for certificate files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                cert_file = os.path.join(temp_dir, "tls.crt")
-                key_file = os.path.join(temp_dir, "tls.key")
-                csr_file = os.path.join(temp_dir, "csr.conf")
-                
-                # Create CSR configuration
-                csr_config = self._create_csr_config()
-                with open(csr_file, "w") as f:
-                    f.write(csr_config)
-                
-                # Generate private key and certificate
-                cmd = [
-                    "openssl", "req", "-x509", "-newkey", "rsa:2048",
-                    "-keyout", key_file,
-                    "-out", cert_file,
-                    "-days", str(self.cert_expiry_days),
-                    "-nodes",
-                    "-config", csr_file,
-                    "-extensions", "req_ext"
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                
-                # Read generated files
-                with open(cert_file, "rb") as f:
-                    cert_data = f.read()
-                
-                with open(key_file, "rb") as f:
-                    key_data = f.read()
-                
-                # Encode in base64 for Kubernetes
-                cert_b64 = base64.b64encode(cert_data).decode('utf-8')
-                key_b64 = base64.b64encode(key_data).decode('utf-8')
-                
-                log_success(logger, 'SnapHook', 'Certificate Generation', f'Successfully generated self-signed certificates')
-                
-                return {
-                    "cert": cert_b64,
-                    "key": key_b64,
-                    "cert_data": cert_data.decode('utf-8'),
-                    "key_data": key_data.decode('utf-8'),
-                    "expiry_days": self.cert_expiry_days,
-                    "generated_at": datetime.now().isoformat()
-                }
-                
-        except subprocess.CalledProcessError as e:
-            log_error(logger, 'SnapHook', 'Error Handling', f'OpenSSL command failed: {e.stderr}')
-            raise
-        except Exception as e:
-            log_error(logger, 'SnapHook', 'Error Handling', f'Certificate generation failed: {e}')
-            raise
-    
-    def _create_csr_config(self) -> str:
-        """
-        Create OpenSSL CSR configuration with proper SANs.
-        
-        Returns:
-            CSR configuration content
-        """
-        # Extract hostname from webhook URL
-        webhook_host = self.webhook_url.replace("https://", "").replace("http://", "").split("/")[0]
-        
-        # Generate all possible DNS names for the webhook
-        dns_names = [
-            webhook_host,
-            "localhost",
-            "127.0.0.1",
-            f"snaphook.{self.namespace}.svc",
-            f"snaphook.{self.namespace}.svc.cluster.local",
-            f"snaphook.{self.namespace}.svc.cluster",
-            f"snaphook.{self.namespace}",
-            "snaphook"
-        ]
-        
-        # Add cluster-specific names if cluster name is available
-        if self.cluster_name and self.cluster_name != "unknown":
-            cluster_suffix = f".{self.cluster_name}.cluster.local"
-            dns_names.extend([
-                f"snaphook.{self.namespace}.svc{cluster_suffix}",
-                f"snaphook.{self.namespace}{cluster_suffix}"
-            ])
-        
-        # Extract IP addresses from SNAP_API_URL and webhook URL
-        ip_addresses = []
-        try:
-            import socket
-            import os
-            
-            # Get IP from SNAP_API_URL environment variable
-            snap_api_url = os.getenv("SNAP_API_URL", "http://localhost:8000")
-            api_host = snap_api_url.replace("http://", "").replace("https://", "").split("/")[0].split(":")[0]
-            
-            # Try to resolve IP addresses
-            hosts_to_resolve = [api_host, webhook_host]
-            
-            for host in hosts_to_resolve:
-                if host and not host.startswith('snaphook') and not host.startswith('localhost'):
-                    try:
-                        ip = socket.gethostbyname(host)
-                        ip_addresses.append(ip)
-                        log_info(logger, 'SnapHook', 'Network Configuration', f'Resolved {host} to {ip}')
-                    except socket.gaierror:
-                        # If host is already an IP address, add it directly
-                        try:
-                            socket.inet_aton(host)
-                            ip_addresses.append(host)
-                            log_info(logger, 'SnapHook', 'Network Configuration', f'Using IP address directly: {host}')
-                        except socket.error:
-                            pass
-            
-            # Add common local IPs as fallback
-            ip_addresses.extend([
-                "127.0.0.1"
-            ])
-            
-            # Remove duplicates while preserving order
-            ip_addresses = list(dict.fromkeys(ip_addresses))
-            
-            log_info(logger, 'SnapHook', 'Network Configuration', f'Generated IP addresses for certificate: {ip_addresses}')
-            
-        except Exception as e:
-            log_warning(logger, 'SnapHook', 'Network Configuration', f'Could not extract IP addresses: {e}')
-            # Fallback to common IPs
-            ip_addresses = ["127.0.0.1"]
-        
-        # Create DNS names section
-        dns_section = "\n".join([f"DNS.{i+1} = {dns}" for i, dns in enumerate(dns_names)])
-        
-        # Create IP addresses section
-        ip_section = "\n".join([f"IP.{i+1} = {ip}" for i, ip in enumerate(ip_addresses)])
-        
-        csr_config = f"""[req]
-default_bits = 2048
-prompt = no
-default_md = sha256
-req_extensions = req_ext
-distinguished_name = dn
-
-[dn]
-O = SnapHook Webhook
-CN = {webhook_host}
-
-[req_ext]
-subjectAltName = @alt_names
-
-[alt_names]
-{dns_section}
-{ip_section}
-"""
-        return csr_config
-    
     def _create_mutating_webhook_configuration(self) -> client.V1MutatingWebhookConfiguration:
         """
         Create MutatingWebhookConfiguration object.
@@ -357,35 +304,71 @@ subjectAltName = @alt_names
         
         return webhook_config
     
+    def _webhook_configuration_body(self) -> Dict[str, Any]:
+        """
+        Return the serialized MutatingWebhookConfiguration for this hook.
+        The model tree is built and serialized once and reused until the webhook
+        URL or CA bundle changes; everything else in it is fixed per hook.
+        """
+        key = (self.webhook_url, self.ca_bundle)
+        cached = self._webhook_body_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        body = self.kube_client.sanitize_for_serialization(self._create_mutating_webhook_configuration())
+        self._webhook_body_cache = (key, body)
+        return body
+    
+    def _build_response_templates(self):
+        """
+        Pre-serialize this hook's AdmissionReview responses.
+        Everything but the uid, pod name, patch and error text is constant per hook.
+        """
+        message_prefix = b"SnapHook '" + _json_string_body(self.name).replace(b'%', b'%%') + b"': "
+        self._patched_response = (
+            _RESPONSE_PREFIX
+            + b'"allowed":true,"patchType":"JSONPatch","patch":"%s","status":{"message":"'
+            + message_prefix + b'Successfully patched pod %s with %d patches"}}}'
+        )
+        self._unpatched_response = (
+            _RESPONSE_PREFIX
+            + b'"allowed":true,"status":{"message":"'
+            + message_prefix + b'No modifications needed for pod %s"}}}'
+        )
+        self._pod_error_response = (
+            _RESPONSE_PREFIX
+            + b'"allowed":false,"status":{"message":"'
+            + message_prefix + b'Error processing pod: %s"}}}'
+        )
+        self._webhook_error_response = (
+            _RESPONSE_PREFIX
+            + b'"allowed":false,"status":{"message":"'
+            + message_prefix + b'Error processing webhook: %s"}}}'
+        )
+    
     def _create_webhook_handler(self):
         """Create webhook handler function for shared server."""
         def webhook_handler(body):
             """Handle webhook request for this specific hook."""
             try:
-                # Process the webhook request using the existing logic
-                return self._process_webhook_request(body)
+                # Run the admission logic on the shared webhook loop so concurrent
+                # admissions overlap their skopeo/API awaits instead of each
+                # spinning up private event loops
+                return _run_on_webhook_loop(self._process_webhook_request(body))
             except Exception as e:
                 log_error(logger, 'SnapHook', 'Error Handling', f"Error processing webhook request: {e}")
-                return {
-                    "apiVersion": "admission.k8s.io/v1",
-                    "kind": "AdmissionReview",
-                    "response": {
-                        "uid": body.get("request", {}).get("uid", ""),
-                        "allowed": False,
-                        "status": {
-                            "message": f"Error processing webhook: {str(e)}"
-                        }
-                    }
-                }
+                return self._webhook_error_response % (
+                    orjson.dumps(body.get("request", {}).get("uid", "")), _json_string_body(e)
+                )
         return webhook_handler
     
-    def _process_webhook_request(self, body):
+    async def _process_webhook_request(self, body):
         """Process webhook request - extracted from the original handler logic."""
         try:
             # Extract admission review from request
-            admission_review = body.get("request", {})
-            pod_spec = admission_review.get("object", {})
-            metadata = pod_spec.get("metadata", {})
+            admission_review = body.get("request") or _EMPTY_DICT
+            pod_spec = admission_review.get("object") or _EMPTY_DICT
+            metadata = pod_spec.get("metadata") or _EMPTY_DICT
             
             # Get pod name - handle both 'name' and 'generateName'
             pod_name = metadata.get("name")
@@ -396,377 +379,177 @@ subjectAltName = @alt_names
             
             namespace = admission_review.get("namespace", "default")
             
-            print(f"SnapHook '{self.name}': Got request for pod {pod_name}")
+            logger.info("SnapHook '%s': Got request for pod %s", self.name, pod_name)
+            
+            # Most pods are not opted in; answer them before any per-container work
+            labels = metadata.get("labels") or _EMPTY_DICT
+            if labels.get("snap.weaversoft.io/snap") != "true":
+                return self._unpatched_response % (
+                    orjson.dumps(admission_review.get("uid", "")), _json_string_body(pod_name)
+                )
             
-            # Check if pod needs SnapHook modification
-            patches = []
-            should_patch_image = False
-            generated_image_tag = None
+            # Check if pod needs SnapHook modification; image patches are kept pre-serialized
+            image_patches: List[bytes] = []
             
             try:
                 # Extract pod information
-                containers = pod_spec.get("spec", {}).get("containers", [])
-                labels = pod_spec.get("metadata", {}).get("labels", {})
+                spec = pod_spec.get("spec") or _EMPTY_DICT
+                containers = spec.get("containers") or ()
+                app_name = self._extract_app_name_from_pod(pod_name, labels)
+                pod_template_hash = labels.get("pod-template-hash", "unknown")
                 
-                # Check if pod has the snap label
-                if labels.get("snap.weaversoft.io/snap") == "true":
-                    for container in containers:
-                        container_name = container.get("name", "unknown")
-                        original_image = container.get("image", "")
-                        
-                        # Extract app name and digest
-                        app_name = self._extract_app_name_from_pod(pod_name, labels)
-                        orig_image_short_digest = self._extract_digest_from_pod(pod_spec)
-                        
-                        # Generate new image tag
-                        # We need to get registry and repo from cluster cache configuration
-                        try:
-                            snap_config = self._get_snap_config_from_cluster_cache_api(self.cluster_name)
-                            registry = snap_config["cache_registry"]
-                            repo = snap_config["cache_repo"]
-                        except Exception as e:
-                            print(f"SnapHook: Failed to load cluster cache config: {e}")
-                            # Fallback to default values
-                            registry = "Need.Registry.Here:8081"  # Default registry
-                            repo = "Repo.Name.Here"  # Default repo
-                        pod_template_hash = labels.get("pod-template-hash", "unknown")
-                        
-                        generated_image_tag = self._generate_image_tag(
-                            registry=registry,
-                            repo=repo,
-                            cluster=self.cluster_name,
-                            namespace=namespace,
-                            app=app_name,
-                            origImageShortDigest=orig_image_short_digest,
-                            PodTemplateHash=pod_template_hash
+                if containers:
+                    # Digest and cluster cache config are per pod and independent; fetch them together
+                    orig_image_short_digest, snap_config = await asyncio.gather(
+                        self._extract_digest_cached(pod_spec), self._get_cached_snap_config(), return_exceptions=True
+                    )
+                    if isinstance(orig_image_short_digest, BaseException):
+                        raise orig_image_short_digest
+                    
+                    # We need to get registry and repo from cluster cache configuration
+                    try:
+                        if isinstance(snap_config, BaseException):
+                            raise snap_config
+                        registry = snap_config["cache_registry"]
+                        repo = snap_config["cache_repo"]
+                    except Exception as e:
+                        invalidate_snap_config_cache(self.cluster_name)
+                        logger.warning("SnapHook: Failed to load cluster cache config: %s", e)
+                        # Fallback to default values
+                        registry = "Need.Registry.Here:8081"  # Default registry
+                        repo = "Repo.Name.Here"  # Default repo
+                
+                for index, container in enumerate(containers):
+                    # Generate new image tag
+                    generated_image_tag = self._generate_image_tag(
+                        registry=registry,
+                        repo=repo,
+                        cluster=self.cluster_name,
+                        namespace=namespace,
+                        app=app_name,
+                        origImageShortDigest=orig_image_short_digest,
+                        PodTemplateHash=pod_template_hash
+                    )
+                    
+                    logger.debug("SnapHook: Generated image tag: %s", generated_image_tag)
+                    
+                    if generated_image_tag:
+                        # Check if image exists in registry using skopeo
+                        logger.debug("SnapHook: Checking if image exists: %s", generated_image_tag)
+                        image_exists = await self._check_image_exists_cached(
+                            registry, repo, self.cluster_name, namespace, app_name, 
+                            orig_image_short_digest, pod_template_hash
                         )
                         
-                        print(f"SnapHook: Generated image tag: {generated_image_tag}")
-                        
-                        if generated_image_tag:
-                            # Check if image exists in registry using skopeo
-                            print(f"SnapHook: Checking if image exists: {generated_image_tag}")
-                            image_exists = self._check_image_exists_multi_registry(
-                                registry, repo, self.cluster_name, namespace, app_name, 
-                                orig_image_short_digest, pod_template_hash
-                            )
-                            
-                            if image_exists:
-                                print(f"SnapHook: Image exists, will patch pod")
-                                # Create patch for image
-                                patch = {
-                                    "op": "replace",
-                                    "path": f"/spec/containers/{containers.index(container)}/image",
-                                    "value": generated_image_tag
-                                }
-                                patches.append(patch)
-                                
-                                # Add mutation label
-                                mutation_patch = {
-                                    "op": "replace",
-                                    "path": "/metadata/labels/snap.weaversoft.io~1mutated",
-                                    "value": "true"
-                                }
-                                patches.append(mutation_patch)
-                                should_patch_image = True
-                            else:
-                                print(f"SnapHook: Image does not exist, skipping patch")
+                        if image_exists:
+                            logger.debug("SnapHook: Image exists, will patch pod")
+                            # Create patch for image
+                            image_patches.append(orjson.dumps({
+                                "op": "replace",
+                                "path": f"/spec/containers/{index}/image",
+                                "value": generated_image_tag
+                            }))
                         else:
-                            print(f"SnapHook: Failed to generate image tag, skipping patch")
-                
+                            logger.debug("SnapHook: Image does not exist, skipping patch")
+                    else:
+                        logger.debug("SnapHook: Failed to generate image tag, skipping patch")
+            
                 # Create response
-                if should_patch_image and patches:
-                    # Encode patches as base64
-                    import base64
-                    patches_json = json.dumps(patches)
-                    patches_b64 = base64.b64encode(patches_json.encode('utf-8')).decode('utf-8')
+                if image_patches:
+                    # Image patches plus the constant mutation label, joined into one JSON array
+                    image_patches.append(_MUTATED_LABEL_PATCH)
+                    # Encode patches as base64 (bytes in, bytes out; the shared server writes the result as-is)
+                    patches_b64 = base64.b64encode(b"[" + b",".join(image_patches) + b"]")
                     
-                    print(f"SnapHook '{self.name}': Patched pod {pod_name} with {len(patches)} patches")
+                    logger.info("SnapHook '%s': Patched pod %s with %d patches", self.name, pod_name, len(image_patches))
                     
-                    response = {
-                        "apiVersion": "admission.k8s.io/v1",
-                        "kind": "AdmissionReview",
-                        "response": {
-                            "uid": admission_review.get("uid", ""),
-                            "allowed": True,
-                            "patchType": "JSONPatch",
-                            "patch": patches_b64,
-                            "status": {
-                                "message": f"SnapHook '{self.name}': Successfully patched pod {pod_name} with {len(patches)} patches"
-                            }
-                        }
-                    }
-                else:
-                    print(f"SnapHook '{self.name}': No patches needed for pod {pod_name}")
-                    response = {
-                        "apiVersion": "admission.k8s.io/v1",
-                        "kind": "AdmissionReview",
-                        "response": {
-                            "uid": admission_review.get("uid", ""),
-                            "allowed": True,
-                            "status": {
-                                "message": f"SnapHook '{self.name}': No modifications needed for pod {pod_name}"
-                            }
-                        }
-                    }
+                    return self._patched_response % (
+                        orjson.dumps(admission_review.get("uid", "")), patches_b64,
+                        _json_string_body(pod_name), len(image_patches)
+                    )
                 
-                return response
+                logger.debug("SnapHook '%s': No patches needed for pod %s", self.name, pod_name)
+                return self._unpatched_response % (
+                    orjson.dumps(admission_review.get("uid", "")), _json_string_body(pod_name)
+                )
                 
             except Exception as e:
-                print(f"❌ ERROR: SnapHook '{self.name}': Error processing pod {pod_name}: {e}")
-                return {
-                    "apiVersion": "admission.k8s.io/v1",
-                    "kind": "AdmissionReview",
-                    "response": {
-                        "uid": admission_review.get("uid", ""),
-                        "allowed": False,
-                        "status": {
-                            "message": f"SnapHook '{self.name}': Error processing pod: {str(e)}"
-                        }
-                    }
-                }
+                logger.error("SnapHook '%s': Error processing pod %s: %s", self.name, pod_name, e)
+                return self._pod_error_response % (
+                    orjson.dumps(admission_review.get("uid", "")), _json_string_body(e)
+                )
                 
         except Exception as e:
-            print(f"❌ ERROR: SnapHook '{self.name}': Error in webhook processing: {e}")
-            return {
-                "apiVersion": "admission.k8s.io/v1",
-                "kind": "AdmissionReview",
-                "response": {
-                    "uid": body.get("request", {}).get("uid", ""),
-                    "allowed": False,
-                    "status": {
-                        "message": f"SnapHook '{self.name}': Error processing webhook: {str(e)}"
-                    }
-                }
-            }
+            logger.error("SnapHook '%s': Error in webhook processing: %s", self.name, e)
+            return self._webhook_error_response % (
+                orjson.dumps(body.get("request", {}).get("uid", "")), _json_string_body(e)
+            )
     
-    def _create_webhook_handler_old(self):
-        """Create HTTP request handler for webhook endpoint."""
-        snaphook_instance = self  # Capture the SnapHook instance
+    async def _get_cached_snap_config(self) -> Dict[str, str]:
+        """
+        Return the cluster cache registry/repo, fetching it at most once per SNAP_CONFIG_TTL.
+        The cache is shared by all hooks of a cluster and only replaces whole entries.
+        """
+        cached = _SNAP_CONFIG_CACHE.get(self.cluster_name)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < SNAP_CONFIG_TTL:
+            return cached[1]
         
-        class WebhookHandler(BaseHTTPRequestHandler):
-            def do_POST(self):
-                # Handle query parameters by splitting on '?'
-                path = self.path.split('?')[0]
-                if path == '/mutate':
-                    self._handle_mutate_request()
-                else:
-                    self._send_error_response(404, "Not Found")
-            
-            def _handle_mutate_request(self):
-                """Handle Kubernetes admission webhook requests."""
-                print(f"SnapHook: Received webhook request from {self.client_address[0]}")
-                try:
-                    # Read request body
-                    content_length = int(self.headers.get('Content-Length', 0))
-                    post_data = self.rfile.read(content_length)
-                    
-                    # Parse JSON request
-                    request_data = json.loads(post_data.decode('utf-8'))
-                    
-                    log_info(logger, 'SnapHook', 'Webhook Processing', f'Received webhook request for pod mutation')
-                    
-                    # Extract admission review from request
-                    admission_review = request_data.get("request", {})
-                    pod_spec = admission_review.get("object", {})
-                    pod_name = pod_spec.get("metadata", {}).get("name", "unknown")
-                    namespace = admission_review.get("namespace", "default")
-                    
-                    log_info(logger, 'SnapHook', 'Pod Mutation', f'Processing pod {pod_name} in namespace {namespace}')
-                    
-                    # Check if pod needs SnapHook modification
-                    patches = []
-                    should_patch_image = False
-                    generated_image_tag = None
-                    
-                    try:
-                        # Extract pod information
-                        containers = pod_spec.get("spec", {}).get("containers", [])
-                        
-                        if containers:
-                            # Get the first container's image for analysis
-                            first_container = containers[0]
-                            original_image = first_container.get("image", "")
-                            
-                            # Extract pod metadata
-                            meta = pod_spec.get("metadata", {}) or {}
-                            namespace = meta.get("namespace", "unknown")
-                            labels = meta.get("labels", {}) or {}
-                            pod_name = meta.get("name", "unknown")
-                            
-                            # If pod_name is "unknown", try to use generateName
-                            if pod_name == "unknown":
-                                generate_name = meta.get("generateName", "")
-                                if generate_name:
-                                    # Remove trailing dash from generateName
-                                    pod_name = generate_name.rstrip("-")
-                                    print(f"SnapHook: Using generateName: '{generate_name}' -> pod_name: '{pod_name}'")
-                            
-                            # Extract app name from pod metadata
-                            app_name = snaphook_instance._extract_app_name_from_pod(pod_name, labels)
-                            pod_template_hash = labels.get("pod-template-hash", "unknown")
-                            
-                            print(f"SnapHook: Processing pod {pod_name} in namespace {namespace}, app: {app_name}")
-                            
-                            # Extract digest from original image
-                            orig_image_short_digest = snaphook_instance._extract_digest_from_pod(pod_spec)
-                            
-                            # Get registry and repo from cluster cache configuration
-                            try:
-                                snap_config = snaphook_instance._get_snap_config_from_cluster_cache_api(snaphook_instance.cluster_name)
-                                cache_registry = snap_config["cache_registry"]
-                                cache_repo = snap_config["cache_repo"]
-                            except Exception as e:
-                                print(f"SnapHook: Failed to load cluster cache config: {e}")
-                                # Fallback to environment variables
-                                cache_registry = os.getenv("snap_registry", "docker.io")
-                                cache_repo = os.getenv("snap_repo", "snap")
-                            
-                            # Generate the complete image tag
-                            try:
-                                generated_image_tag = snaphook_instance._generate_image_tag(
-                                    registry=cache_registry,
-                                    repo=cache_repo,
-                                    cluster=snaphook_instance.cluster_name,
-                                    namespace=namespace,
-                                    app=app_name,
-                                    origImageShortDigest=orig_image_short_digest,
-                                    PodTemplateHash=pod_template_hash
-                                )
-                            except Exception as tag_error:
-                                print(f"SnapHook: Failed to generate image tag: {tag_error}")
-                                generated_image_tag = None
-                            
-                            print(f"SnapHook: Generated image tag: {generated_image_tag}")
-                            
-                            if generated_image_tag:
-                                # Check if image exists in registry
-                                image_exists = snaphook_instance._check_image_exists_multi_registry(
-                                    cache_registry, cache_repo, snaphook_instance.cluster_name, namespace, app_name, 
-                                    orig_image_short_digest, pod_template_hash
-                                )
-                                
-                                if image_exists:
-                                    should_patch_image = True
-                                    # Patch all container images
-                                    for i, container in enumerate(containers):
-                                        patches.append({
-                                            "op": "replace",
-                                            "path": f"/spec/containers/{i}/image",
-                                            "value": generated_image_tag
-                                        })
-                                    
-                                    # Add mutation label
-                                    patches.append({
-                                        "op": "replace",
-                                        "path": "/metadata/labels/snap.weaversoft.io~1mutated",
-                                        "value": "true"
-                                    })
-                                    
-                                    print(f"SnapHook: Patching pod {pod_name} with image {generated_image_tag}")
-                                else:
-                                    print(f"SnapHook: Image {generated_image_tag} not found in registry, skipping patch")
-                            else:
-                                print(f"SnapHook: Could not generate image tag for pod {pod_name}")
-                        else:
-                            print(f"SnapHook: No containers found in pod {pod_name}")
-                            
-                    except Exception as e:
-                        print(f"SnapHook: Error processing pod: {e}")
-                        # Continue without patching on error
-                    
-                    # Create response
-                    response = {
-                        "apiVersion": "admission.k8s.io/v1",
-                        "kind": "AdmissionReview",
-                        "response": {
-                            "uid": admission_review.get("uid"),
-                            "allowed": True,
-                            "patch": base64.b64encode(json.dumps(patches).encode()).decode() if patches else None,
-                            "patchType": "JSONPatch" if patches else None
-                        }
-                    }
-                    print(f"SnapHook: Response - patched: {len(patches) > 0}")
-                    
-                    # Send response
-                    self._send_json_response(200, response)
-                    log_success(logger, 'SnapHook', 'Response Handling', f'Webhook response sent for pod {pod_name}')
-                    
-                except Exception as e:
-                    log_error(logger, 'SnapHook', 'Error Handling', f'Webhook error: {e}')
-                    
-                    # Return error response
-                    error_response = {
-                        "apiVersion": "admission.k8s.io/v1",
-                        "kind": "AdmissionReview",
-                        "response": {
-                            "uid": request_data.get("request", {}).get("uid") if 'request_data' in locals() else None,
-                            "allowed": False,
-                            "status": {
-                                "message": f"SnapHook webhook error: {str(e)}"
-                            }
-                        }
-                    }
-                    
-                    self._send_json_response(500, error_response)
-            
-            def _send_json_response(self, status_code, data):
-                """Send JSON response."""
-                response_json = json.dumps(data)
-                self.send_response(status_code)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(response_json)))
-                self.end_headers()
-                self.wfile.write(response_json.encode('utf-8'))
-            
-            def _send_error_response(self, status_code, message):
-                """Send error response."""
-                self.send_response(status_code)
-                self.send_header('Content-Type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(message.encode('utf-8'))
-            
-            def log_message(self, format, *args):
-                """Override to use our logger."""
-                log_info(logger, 'SnapHook', 'HTTPS Server', f"SnapHook HTTPS Server: {format % args}")
+        snap_config = await get_snap_config_from_cluster_cache_api(self.cluster_name)
+        _SNAP_CONFIG_CACHE[self.cluster_name] = (now, snap_config)
+        return snap_config
+    
+    async def _extract_digest_cached(self, pod_spec) -> str:
+        """
+        Resolve the short digest of the pod's image, reusing recent skopeo lookups.
+        Pods being admitted have no status yet, so every replica of a rollout would
+        otherwise inspect the same source image again.
+        """
+        containers = (pod_spec.get("spec") or _EMPTY_DICT).get("containers") or ()
+        image_ref = containers[0].get("image") if containers else None
+        if not image_ref or (pod_spec.get("status") or _EMPTY_DICT).get("containerStatuses"):
+            return await extract_digest(pod_spec)
+        
+        now = time.monotonic()
+        cached = _DIGEST_CACHE.get(image_ref)
+        if cached is not None:
+            if cached[0] > now:
+                _DIGEST_CACHE.move_to_end(image_ref)
+                return cached[1]
+            del _DIGEST_CACHE[image_ref]
         
-        return WebhookHandler
+        digest = await extract_digest(pod_spec)
+        if digest and digest != "unknown":
+            _DIGEST_CACHE[image_ref] = (now + DIGEST_CACHE_TTL, digest)
+            while len(_DIGEST_CACHE) > DIGEST_CACHE_MAX:
+                _DIGEST_CACHE.popitem(last=False)
+        return digest
     
-    def _start_https_server(self):
-        """Start HTTPS server in a separate thread."""
-        try:
-            # Create SSL context
-            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-            
-            # Load certificate and key
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.crt', delete=False) as f:
-                f.write(self.cert_data["cert_data"])
-                cert_file = f.name
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.key', delete=False) as f:
-                f.write(self.cert_data["key_data"])
-                key_file = f.name
-            
-            try:
-                ssl_context.load_cert_chain(cert_file, key_file)
-                
-                # Create HTTPS server
-                handler = self._create_webhook_handler()
-                self.https_server = HTTPServer(('0.0.0.0', 8443), handler)
-                self.https_server.socket = ssl_context.wrap_socket(self.https_server.socket, server_side=True)
-                
-                log_info(logger, 'SnapHook', 'HTTPS Server', f'Starting HTTPS server on port 8443')
-                self.is_running = True
-                self.https_server.serve_forever()
-                
-            finally:
-                # Clean up temporary files
-                os.unlink(cert_file)
-                os.unlink(key_file)
-                
-        except Exception as e:
-            log_error(logger, 'SnapHook', 'Error Handling', f'Failed to start HTTPS server: {e}')
-            self.is_running = False
+    async def _check_image_exists_cached(self, registry: str, repo: str, cluster: str,
+                                         namespace: str, app: str, orig_digest: str,
+                                         pod_hash: str) -> bool:
+        """
+        Check the registry for a snapshot image, reusing recent answers.
+        Replicas of one rollout share the key, so a burst costs one registry probe.
+        """
+        key = (registry, repo, cluster, namespace, app, orig_digest, pod_hash)
+        cache = self._image_exists_cache
+        now = time.monotonic()
+        cached = cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                cache.move_to_end(key)
+                return cached[1]
+            del cache[key]
+        
+        exists = await check_image_exists_multi_registry(
+            registry, repo, cluster, namespace, app, orig_digest, pod_hash
+        )
+        cache[key] = (now + (IMAGE_EXISTS_TTL if exists else IMAGE_MISSING_TTL), exists)
+        cache.move_to_end(key)
+        while len(cache) > IMAGE_EXISTS_CACHE_MAX:
+            cache.popitem(last=False)
+        return exists
     
     def start(self) -> bool:
         """
@@ -791,59 +574,15 @@ subjectAltName = @alt_names
             # Step 2: Get shared certificate data
             self.cert_data = shared_https_server.get_cert_data()
             # CA bundle needs to be base64-encoded for Kubernetes
-            import base64
-            self.ca_bundle = base64.b64encode(shared_https_server.get_ca_bundle().encode('utf-8')).decode('utf-8')
-            
-            # Step 3: Create MutatingWebhookConfiguration with unique name
-            webhook_config = self._create_mutating_webhook_configuration()
-            webhook_name = f"snaphook-{self.name}-{self.cluster_name}"
-            
-            # Step 4: Deploy webhook configuration to Kubernetes
-            admission_v1 = client.AdmissionregistrationV1Api(self.kube_client)
-            
-            # First, try to delete any existing webhook configuration with the same name
-            try:
-                admission_v1.delete_mutating_webhook_configuration(name=webhook_name)
-                log_info(logger, 'SnapHook', 'Webhook Configuration', f'Deleted existing webhook configuration \'{webhook_name}\'')
-                # Wait a moment for the deletion to complete
-                import time
-                time.sleep(1)
-            except ApiException as e:
-                if e.status != 404:
-                    log_warning(logger, 'SnapHook', 'Webhook Configuration', f'Error deleting existing webhook: {e}')
-                # Continue with creation even if deletion fails
+            self.ca_bundle = _encode_ca_bundle(shared_https_server.get_ca_bundle())
             
-            # Now create the new webhook configuration
-            try:
-                log_info(logger, 'SnapHook', 'Webhook Configuration', f'Creating webhook configuration \'{webhook_name}\'...')
-                admission_v1.create_mutating_webhook_configuration(body=webhook_config)
-                log_success(logger, 'SnapHook', 'Webhook Configuration', f'Webhook configuration created successfully')
-            except ApiException as e:
-                if e.status == 409:  # Conflict - webhook already exists
-                    log_info(logger, 'SnapHook', 'Webhook Configuration', f'Webhook already exists, updating...')
-                    # Get existing config and update it
-                    existing_config = admission_v1.read_mutating_webhook_configuration(
-                        name=webhook_name
-                    )
-                    # Update the existing config with new data while preserving resourceVersion
-                    existing_config.webhooks = webhook_config.webhooks
-                    existing_config.metadata.labels = webhook_config.metadata.labels
-                    # Update the CA bundle and URL in the webhook
-                    if existing_config.webhooks:
-                        existing_config.webhooks[0].client_config.ca_bundle = webhook_config.webhooks[0].client_config.ca_bundle
-                        existing_config.webhooks[0].client_config.url = webhook_config.webhooks[0].client_config.url
-                    
-                    admission_v1.replace_mutating_webhook_configuration(
-                        name=webhook_name,
-                        body=existing_config
-                    )
-                    log_success(logger, 'SnapHook', 'Webhook Configuration', f'Webhook configuration updated successfully')
-                else:
-                    log_error(logger, 'SnapHook', 'Error Handling', f'Failed to create/update webhook configuration: {e}')
-                    raise
+            # Step 3: Create or update the MutatingWebhookConfiguration with the shared CA bundle
+            self._apply_webhook_configuration()
             
-            # Step 5: Register this hook with the shared server
-            shared_https_server.register_hook_handler(self.name, self._create_webhook_handler())
+            # Step 4: Register this hook with the shared server; certificate reloads re-push the CA bundle
+            shared_https_server.register_hook_handler(
+                self.name, self._create_webhook_handler(), on_cert_reload=self._on_certificate_reload
+            )
             
             self.is_running = True
             log_success(logger, 'SnapHook', 'Operation Start', f'Successfully started \'{self.name}\' for cluster {self.cluster_name}')
@@ -853,76 +592,85 @@ subjectAltName = @alt_names
                 
         except Exception as e:
             log_error(logger, 'SnapHook', 'Error Handling', f'Failed to start: {e}')
-            import traceback
             log_error(logger, 'SnapHook', 'Error Handling', f'Traceback: {traceback.format_exc()}')
             return False
     
+    def _apply_webhook_configuration(self) -> None:
+        """
+        Create this hook's MutatingWebhookConfiguration, or replace the existing one,
+        so the apiserver gets the current webhook URL and CA bundle.
+        
+        Raises:
+            ApiException: If the configuration cannot be read, created or replaced
+        """
+        webhook_body = self._webhook_configuration_body()
+        webhook_name = f"snaphook-{self.name}-{self.cluster_name}"
+        
+        admission_v1 = client.AdmissionregistrationV1Api(self.kube_client)
+        
+        # Look up any existing webhook configuration with the same name, then create or replace it
+        try:
+            existing_config = admission_v1.read_mutating_webhook_configuration(name=webhook_name)
+        except ApiException as e:
+            if e.status != 404:
+                log_error(logger, 'SnapHook', 'Error Handling', f'Failed to read webhook configuration: {e}')
+                raise
+            existing_config = None
+        
+        try:
+            if existing_config is None:
+                log_info(logger, 'SnapHook', 'Webhook Configuration', f'Creating webhook configuration \'{webhook_name}\'...')
+                try:
+                    admission_v1.create_mutating_webhook_configuration(body=webhook_body)
+                    log_success(logger, 'SnapHook', 'Webhook Configuration', f'Webhook configuration created successfully')
+                except ApiException as e:
+                    if e.status != 409:
+                        raise
+                    # Created by someone else since the read; fall back to replacing it
+                    existing_config = admission_v1.read_mutating_webhook_configuration(name=webhook_name)
+            
+            if existing_config is not None:
+                log_info(logger, 'SnapHook', 'Webhook Configuration', f'Webhook already exists, updating...')
+                # Update the existing config with new data while preserving resourceVersion
+                # (webhooks carry the current CA bundle and URL)
+                existing_config.webhooks = webhook_body["webhooks"]
+                existing_config.metadata.labels = webhook_body["metadata"]["labels"]
+                
+                admission_v1.replace_mutating_webhook_configuration(
+                    name=webhook_name,
+                    body=existing_config
+                )
+                log_success(logger, 'SnapHook', 'Webhook Configuration', f'Webhook configuration updated successfully')
+        except ApiException as e:
+            log_error(logger, 'SnapHook', 'Error Handling', f'Failed to create/update webhook configuration: {e}')
+            raise
+    
+    def _on_certificate_reload(self) -> None:
+        """
+        Re-push the CA bundle after the shared server swapped its certificate.
+        Called by the shared server for every registered hook; without it the
+        apiserver keeps trusting the old self-signed certificate and TLS fails.
+        """
+        self.cert_data = shared_https_server.get_cert_data()
+        self.ca_bundle = _encode_ca_bundle(shared_https_server.get_ca_bundle())
+        self._apply_webhook_configuration()
+        log_info(logger, 'SnapHook', 'Webhook Configuration', f'Updated CA bundle for \'{self.name}\' after certificate reload')
+    
     def _extract_app_name_from_pod(self, pod_name: str, labels: dict) -> str:
         """Extract app name from pod metadata."""
-        from flows.helpers import extract_app_name_from_pod
         app = extract_app_name_from_pod(pod_name, labels)
         # Use "unknown" as fallback for webhook (instead of "unknown-app")
         if app == "unknown-app":
             app = "unknown"
         return app
     
-    def _extract_digest_from_pod(self, pod: dict) -> str:
-        """Extract digest from pod using skopeo if needed."""
-        import asyncio
-        from flows.helpers import extract_digest
-        
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(extract_digest(pod))
-        finally:
-            loop.close()
-    
-    def _get_snap_config_from_cluster_cache_api(self, cluster_name: str) -> dict:
-        """Get Snap configuration from cluster cache API (synchronous wrapper)."""
-        import asyncio
-        from flows.helpers import get_snap_config_from_cluster_cache_api
-        
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(get_snap_config_from_cluster_cache_api(cluster_name))
-        finally:
-            loop.close()
-    
     def _generate_image_tag(self, registry: str, repo: str, cluster: str, namespace: str, 
                            app: str, origImageShortDigest: str, PodTemplateHash: str) -> str:
-        """Generate image tag using SnapApi logic."""
-        from classes.imagetag import generate_image_tag
-        return generate_image_tag(
-            registry=registry,
-            repo=repo,
-            cluster=cluster,
-            namespace=namespace,
-            app=app,
-            origImageShortDigest=origImageShortDigest,
-            PodTemplateHash=PodTemplateHash
+        """Generate image tag using SnapApi logic (memoized; the inputs repeat across replicas)."""
+        return _cached_image_tag(
+            registry, repo, cluster, namespace, app, origImageShortDigest, PodTemplateHash
         )
     
-    def _check_image_exists_multi_registry(self, registry: str, repo: str, cluster: str, 
-                                          namespace: str, app: str, orig_digest: str, 
-                                          pod_hash: str) -> bool:
-        """Check if image exists in registry (synchronous wrapper)."""
-        import asyncio
-        from flows.helpers import check_image_exists_multi_registry
-        
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(check_image_exists_multi_registry(
-                registry, repo, cluster, namespace, app, orig_digest, pod_hash
-            ))
-        finally:
-            loop.close()
-    
     def stop(self) -> bool:
         """
         Stop SnapHook - unregister from shared server and delete webhook configuration.
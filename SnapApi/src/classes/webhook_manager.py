@@ -4,8 +4,9 @@ Handles registration, routing, and lifecycle management of webhook handlers.
 """
 
 import logging
-import asyncio
-from typing import Dict, Any, Optional, Callable, List
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Any, Optional, Callable, List, Set, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -30,6 +31,14 @@ class WebhookManager:
         """Initialize WebhookManager."""
         self.handlers: Dict[str, WebhookHandler] = {}
         self.handler_functions: Dict[str, Callable] = {}
+        # Secondary indexes over self.handlers, maintained by register/unregister
+        self._by_type: Dict[str, Set[str]] = defaultdict(set)
+        self._by_cluster: Dict[Optional[str], Set[str]] = defaultdict(set)
+        self._type_counts: Counter = Counter()
+        # Call-independent part of get_handler_stats: (summary counts, [(handler, entry)]);
+        # rebuilt only after a handler is added, removed or toggled
+        self._stats_cache: Optional[Tuple[Dict[str, Any], List[Tuple[WebhookHandler, Dict[str, Any]]]]] = None
+        self._stats_dirty = True
         self.logger = logging.getLogger("automation_api")
     
     def register_handler(self, 
@@ -55,33 +64,37 @@ class WebhookManager:
         """
         try:
             # Normalize path
-            normalized_path = f"/{path.lstrip('/')}"
+            normalized_path = self._norm(path)
             
             if normalized_path in self.handlers:
                 self.logger.warning(f"Handler already exists for path: {normalized_path}")
                 return False
             
-            # Create handler info
-            handler = WebhookHandler(
+            # Create handler info (arguments are validated at the API boundary; skip re-validation)
+            handler = WebhookHandler.model_construct(
                 name=name,
                 path=normalized_path,
                 handler_type=handler_type,
                 description=description,
                 cluster_name=cluster_name,
-                registered_at=asyncio.get_event_loop().time(),
+                registered_at=time.monotonic(),
                 is_active=True,
-                call_count=0
+                call_count=0,
+                last_called=None
             )
             
             # Store handler
             self.handlers[normalized_path] = handler
+            self._stats_dirty = True
+            self._by_type[handler_type].add(normalized_path)
+            self._by_cluster[cluster_name].add(normalized_path)
+            self._type_counts[handler_type] += 1
             
             # Store custom handler function if provided
             if handler_function:
                 self.handler_functions[normalized_path] = handler_function
             
             self.logger.info(f"Registered webhook handler: {name} at {normalized_path}")
-            print(f"🔧 DEBUG: Registered webhook handler: {name} at {normalized_path}")
             
             return True
             
@@ -100,20 +113,25 @@ class WebhookManager:
             bool: True if successful, False otherwise
         """
         try:
-            normalized_path = f"/{path.lstrip('/')}"
+            normalized_path = self._norm(path)
             
             if normalized_path not in self.handlers:
                 self.logger.warning(f"Handler not found for path: {normalized_path}")
                 return False
             
             handler_info = self.handlers.pop(normalized_path)
+            self._stats_dirty = True
+            self._discard_index(self._by_type, handler_info.handler_type, normalized_path)
+            self._discard_index(self._by_cluster, handler_info.cluster_name, normalized_path)
+            self._type_counts[handler_info.handler_type] -= 1
+            if not self._type_counts[handler_info.handler_type]:
+                del self._type_counts[handler_info.handler_type]
             
             # Remove custom handler function if exists
             if normalized_path in self.handler_functions:
                 del self.handler_functions[normalized_path]
             
             self.logger.info(f"Unregistered webhook handler: {handler_info.name} from {normalized_path}")
-            print(f"🗑️ DEBUG: Unregistered webhook handler: {handler_info.name} from {normalized_path}")
             
             return True
             
@@ -131,9 +149,25 @@ class WebhookManager:
         Returns:
             WebhookHandler or None if not found
         """
-        normalized_path = f"/{path.lstrip('/')}"
+        normalized_path = self._norm(path)
         return self.handlers.get(normalized_path)
     
+    @staticmethod
+    def _norm(path: str) -> str:
+        """Normalize a webhook path to exactly one leading slash."""
+        if path.startswith('/') and not path.startswith('//'):
+            return path
+        return '/' + path.lstrip('/')
+    
+    @staticmethod
+    def _discard_index(index: Dict[Any, Set[str]], key: Any, path: str):
+        """Remove path from index[key], dropping the key once its set is empty."""
+        paths = index.get(key)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del index[key]
+    
     def list_handlers(self) -> List[WebhookHandler]:
         """
         List all registered handlers.
@@ -153,8 +187,7 @@ class WebhookManager:
         Returns:
             List of matching WebhookHandler objects
         """
-        return [handler for handler in self.handlers.values() 
-                if handler.handler_type == handler_type]
+        return [self.handlers[path] for path in self._by_type.get(handler_type, ())]
     
     def get_handlers_by_cluster(self, cluster_name: str) -> List[WebhookHandler]:
         """
@@ -166,8 +199,7 @@ class WebhookManager:
         Returns:
             List of matching WebhookHandler objects
         """
-        return [handler for handler in self.handlers.values() 
-                if handler.cluster_name == cluster_name]
+        return [self.handlers[path] for path in self._by_cluster.get(cluster_name, ())]
     
     def update_handler_stats(self, path: str) -> bool:
         """
@@ -179,21 +211,14 @@ class WebhookManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            normalized_path = f"/{path.lstrip('/')}"
-            
-            if normalized_path not in self.handlers:
-                return False
-            
-            handler = self.handlers[normalized_path]
-            handler.call_count += 1
-            handler.last_called = asyncio.get_event_loop().time()
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to update handler stats: {e}")
+        handler = self.handlers.get(self._norm(path))
+        if handler is None:
             return False
+        
+        # Call counters are read live by get_handler_stats, so they don't invalidate its cache
+        handler.call_count += 1
+        handler.last_called = time.monotonic()
+        return True
     
     def deactivate_handler(self, path: str) -> bool:
         """
@@ -206,12 +231,13 @@ class WebhookManager:
             bool: True if successful, False otherwise
         """
         try:
-            normalized_path = f"/{path.lstrip('/')}"
+            normalized_path = self._norm(path)
             
             if normalized_path not in self.handlers:
                 return False
             
             self.handlers[normalized_path].is_active = False
+            self._stats_dirty = True
             self.logger.info(f"Deactivated webhook handler: {normalized_path}")
             
             return True
@@ -231,12 +257,13 @@ class WebhookManager:
             bool: True if successful, False otherwise
         """
         try:
-            normalized_path = f"/{path.lstrip('/')}"
+            normalized_path = self._norm(path)
             
             if normalized_path not in self.handlers:
                 return False
             
             self.handlers[normalized_path].is_active = True
+            self._stats_dirty = True
             self.logger.info(f"Activated webhook handler: {normalized_path}")
             
             return True
@@ -248,39 +275,44 @@ class WebhookManager:
     def get_handler_stats(self) -> Dict[str, Any]:
         """
         Get overall handler statistics.
+        Counts and per-handler metadata are cached until a handler is added, removed
+        or toggled; call counters are read fresh each time. Every call returns a new
+        dict, so callers may modify it.
         
         Returns:
             Dict containing statistics
         """
-        total_handlers = len(self.handlers)
-        active_handlers = len([h for h in self.handlers.values() if h.is_active])
-        total_calls = sum(h.call_count for h in self.handlers.values())
-        
-        handler_types = {}
-        for handler in self.handlers.values():
-            handler_type = handler.handler_type
-            if handler_type not in handler_types:
-                handler_types[handler_type] = 0
-            handler_types[handler_type] += 1
-        
-        return {
-            "total_handlers": total_handlers,
-            "active_handlers": active_handlers,
-            "inactive_handlers": total_handlers - active_handlers,
-            "total_calls": total_calls,
-            "handler_types": handler_types,
-            "handlers": [
-                {
+        if self._stats_dirty or self._stats_cache is None:
+            total_handlers = len(self.handlers)
+            active_handlers = len([h for h in self.handlers.values() if h.is_active])
+            summary = {
+                "total_handlers": total_handlers,
+                "active_handlers": active_handlers,
+                "inactive_handlers": total_handlers - active_handlers,
+            }
+            entries = [
+                (h, {
                     "name": h.name,
                     "path": h.path,
                     "type": h.handler_type,
                     "cluster_name": h.cluster_name,
                     "is_active": h.is_active,
-                    "call_count": h.call_count,
-                    "last_called": h.last_called
-                }
+                })
                 for h in self.handlers.values()
             ]
+            self._stats_cache = (summary, entries)
+            self._stats_dirty = False
+        
+        summary, entries = self._stats_cache
+        handlers = [
+            dict(entry, call_count=h.call_count, last_called=h.last_called)
+            for h, entry in entries
+        ]
+        return {
+            **summary,
+            "total_calls": sum(entry["call_count"] for entry in handlers),
+            "handler_types": dict(self._type_counts),
+            "handlers": handlers
         }
     
     def cleanup_inactive_handlers(self, max_age_hours: int = 24) -> int:
@@ -294,7 +326,7 @@ class WebhookManager:
             int: Number of handlers cleaned up
         """
         try:
-            current_time = asyncio.get_event_loop().time()
+            current_time = time.monotonic()
             max_age_seconds = max_age_hours * 3600
             
             handlers_to_remove = []
@@ -12,6 +12,19 @@ import threading
 from queue import Queue, Empty
 
 
+class CredentialFilter(logging.Filter):
+    """
+    Drops log records that look like they carry credentials so they are never
+    broadcast to WebSocket clients.
+    """
+    
+    SENSITIVE_MARKERS = ('kube_password', 'password=', 'token=')
+    
+    def filter(self, record):
+        message = record.getMessage().lower()
+        return not any(marker in message for marker in self.SENSITIVE_MARKERS)
+
+
 class WebSocketLogHandler(logging.Handler):
     """
     Custom logging handler that sends log messages to connected WebSocket clients.
@@ -288,6 +301,7 @@ def setup_websocket_logging(send_progress_func=None):
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     websocket_log_handler.setFormatter(formatter)
     websocket_log_handler.setLevel(logging.INFO)
+    websocket_log_handler.addFilter(CredentialFilter())
     
     # Add handler to the automation_api logger (main SnapApi logger)
     automation_logger = logging.getLogger("automation_api")
@@ -323,7 +337,7 @@ def cleanup_websocket_logging():
 
 
 # Helper functions for explicit logging
-def log_with_context(logger, level, initiator, task, message, **kwargs):
+def log_with_context(logger, level, initiator, task, message, *args, **kwargs):
     """
     Log with explicit initiator, task, and message.
     
@@ -332,33 +346,36 @@ def log_with_context(logger, level, initiator, task, message, **kwargs):
         level: Log level (logging.INFO, logging.ERROR, etc.)
         initiator: The initiator (e.g., 'SnapWatcher', 'SnapHook')
         task: The task name (e.g., 'SSL Configuration', 'Operator Start')
-        message: The log message
+        message: The log message, optionally with %-style placeholders
+        *args: Values for the placeholders, only formatted if the record is emitted
         **kwargs: Additional context
     """
+    if not logger.isEnabledFor(level):
+        return
     extra = {
         'log_initiator': initiator,
         'log_task': task,
         'log_message': message,
         **kwargs
     }
-    logger.log(level, message, extra=extra)
+    logger.log(level, message, *args, extra=extra)
 
 
-def log_info(logger, initiator, task, message, **kwargs):
+def log_info(logger, initiator, task, message, *args, **kwargs):
     """Log info message with explicit context."""
-    log_with_context(logger, logging.INFO, initiator, task, message, **kwargs)
+    log_with_context(logger, logging.INFO, initiator, task, message, *args, **kwargs)
 
 
-def log_error(logger, initiator, task, message, **kwargs):
+def log_error(logger, initiator, task, message, *args, **kwargs):
     """Log error message with explicit context."""
-    log_with_context(logger, logging.ERROR, initiator, task, message, **kwargs)
+    log_with_context(logger, logging.ERROR, initiator, task, message, *args, **kwargs)
 
 
-def log_warning(logger, initiator, task, message, **kwargs):
+def log_warning(logger, initiator, task, message, *args, **kwargs):
     """Log warning message with explicit context."""
-    log_with_context(logger, logging.WARNING, initiator, task, message, **kwargs)
+    log_with_context(logger, logging.WARNING, initiator, task, message, *args, **kwargs)
 
 
-def log_success(logger, initiator, task, message, **kwargs):
+def log_success(logger, initiator, task, message, *args, **kwargs):
     """Log success message with explicit context."""
-    log_with_context(logger, logging.INFO, initiator, task, message, **kwargs)
+    log_with_context(logger, logging.INFO, initiator, task, message, *args, **kwargs)
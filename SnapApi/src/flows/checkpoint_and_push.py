@@ -272,7 +272,7 @@ async def checkpoint_and_push_from_pod_spec(request: PodSpecCheckpointRequest, c
 
         # Registry login (optional)
         if cache_registry_user and cache_registry_pass:
-            await run(["buildah", "login", "--username", cache_registry_user, "--password", cache_registry_pass, "--tls-verify=false", cache_registry], check=True)
+            await run(["buildah", "login", "--username", cache_registry_user, "--password-stdin", "--tls-verify=false", cache_registry], check=True, input=(cache_registry_pass + "\n").encode())
 
 
         # Create scratch container, add checkpoint bits, annotate, commit, push
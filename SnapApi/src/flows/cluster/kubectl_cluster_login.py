@@ -1,38 +1,56 @@
 from flows.proccess_utils import run
+import asyncio
+import time
+from typing import Dict, Tuple
 from fastapi import Depends, HTTPException
 import os
-from classes.clusterconfig import ClusterConfig
+from classes.clusterconfig import load_cluster_credentials
 import base64
-from routes.websocket import send_progress
+from routes.websocket import send_progress, ProgressEmitter
 from middleware.verify_token import verify_token
 
+LOGIN_MESSAGE = "Logging in to the kubernetes cluster"
+
+# Context and user reported after a successful login, keyed by (kube_api_url, token).
+# Values are (monotonic timestamp, context, user) and expire after IDENTITY_CACHE_TTL seconds.
+IDENTITY_CACHE_TTL = 60.0
+_identity_cache: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+
+async def _get_context_and_user(identity_key: Tuple[str, str]) -> Tuple[str, str]:
+    """Return the current oc context and user, reusing a recent result for the same login."""
+    cached = _identity_cache.get(identity_key)
+    if cached is not None and time.monotonic() - cached[0] < IDENTITY_CACHE_TTL:
+        return cached[1], cached[2]
+
+    # The two commands are independent, so run them concurrently
+    context_result, user_result = await asyncio.gather(
+        run(["oc", "config", "current-context"]),
+        run(["oc", "whoami"])
+    )
+    context = context_result.stdout.strip()
+    user = user_result.stdout.strip()
+    _identity_cache[identity_key] = (time.monotonic(), context, user)
+    return context, user
+
 # This function is used to login to a kubernetes cluster using kubectl with the given credentials   
 async def kubectl_cluster_login(cluster_config_name: str, username: str):
     try:
-        # Get the cluster config details from the config folder
-        path = f"config/clusters/{cluster_config_name}.json"
-        #check if the file exists
-        if not os.path.exists(path):
+        # Get the cluster credentials from the config folder
+        try:
+            kube_api_url, token = await asyncio.to_thread(load_cluster_credentials, cluster_config_name)
+        except FileNotFoundError:
             message="Cluster config not found"
             await send_progress(username, {"progress": "failed","task_name": "Cluster Login", "message": message})
             return {"success": False, "message": message}
-        
-        try:
-            with open(path, "r") as f:
-                cluster_config = ClusterConfig.model_validate_json(f.read())
         except Exception as e:
             message=f"Error validating cluster config: {str(e)}"
             await send_progress(username, {"progress": "failed","task_name": "Cluster Login", "message": message})
             return {"success": False, "message": message}
         
         # Run oc login with the given credentials
-        kube_api_url = cluster_config.cluster_config_details.kube_api_url
-        token = cluster_config.cluster_config_details.token
-        
-        message=f"Logging in to the kubernetes cluster"
-        await send_progress(username, {"progress": 16, "task_name": "Cluster Login", "message": message})
-        print(f"SnapAPI: Logging in to the kubernetes cluster with token authentication: {kube_api_url}")
-        print("SnapAPI: Using token-based authentication")
+        progress = ProgressEmitter(username, "Cluster Login")
+        progress.emit(16, LOGIN_MESSAGE)
+        print(f"SnapAPI: {LOGIN_MESSAGE} with token authentication: {kube_api_url}")
         
         # Use token-based login with SSL verification control
         verify_ssl = os.getenv('KUBE_VERIFY_SSL', 'false').lower() == 'true'
@@ -45,22 +63,27 @@ async def kubectl_cluster_login(cluster_config_name: str, username: str):
         if not verify_ssl:
             login_cmd.append("--insecure-skip-tls-verify=true")
         
-        await run(login_cmd)
-        await send_progress(username, {"progress": 32, "task_name": "Cluster Login", "message": "Successfully logged in to the kubernetes cluster"})
+        identity_key = (kube_api_url, token)
+        await progress.flush()
+        try:
+            await run(login_cmd)
+        except RuntimeError:
+            _identity_cache.pop(identity_key, None)
+            raise
+        progress.emit(32, "Successfully logged in to the kubernetes cluster")
         print("SnapAPI: Logged in to the kubernetes cluster")
 
-        # Get the current context   
-        await send_progress(username, {"progress": 48, "task_name": "Cluster Login", "message": "Getting the current context"})
-        context = (await run(["oc", "config", "current-context"])).stdout.strip()
+        # Get the current context and user
+        progress.emit(48, "Getting the current context")
+        progress.emit(64, "Getting the current user")
+        await progress.flush()
+        context, user = await _get_context_and_user(identity_key)
         print(f"SnapAPI: Current context: {context}")
-        await send_progress(username, {"progress": 64, "task_name": "Cluster Login", "message": f"Current context: {context}"})
-
-        # Get the current user
-        await send_progress(username, {"progress": 80, "task_name": "Cluster Login", "message": f"Getting the current user"})
-        user = (await run(["oc", "whoami"])).stdout.strip()
         print(f"SnapAPI: Current user: {user}")
+        progress.emit(80, f"Current context: {context}")
 
-        await send_progress(username, {"progress": 100, "task_name": "Cluster Login", "message": f"Current user: {user} Logged in to the kubernetes cluster"})
+        progress.emit(100, f"Current user: {user} Logged in to the kubernetes cluster")
+        await progress.flush()
         return {"success": True, "message": "Logged in to the kubernetes cluster"}
     except Exception as e:
         await send_progress(username, {"progress": "failed", "task_name": "Cluster Login", "message": f"Unexpected error: {str(e)}"})
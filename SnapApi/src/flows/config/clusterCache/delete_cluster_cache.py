@@ -20,6 +20,10 @@ async def delete_cluster_cache(request: DeleteClusterCacheRequest):
         # Delete the cluster cache config file
         os.remove(path)
         
+        # Stop running SnapHooks from patching with the deleted registry/repo
+        from classes.snaphook import invalidate_snap_config_cache
+        invalidate_snap_config_cache(request.cluster)
+        
         return ClusterCacheResponse(
             success=True,
             message=f"Cluster cache config file {request.cluster} deleted successfully"
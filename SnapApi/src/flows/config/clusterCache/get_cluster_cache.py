@@ -1,32 +1,26 @@
-import os
-import json
-from classes.cluster_cache_models import ClusterCacheResponse, ClusterCacheDetails
+from classes.cluster_cache_models import ClusterCacheResponse, ClusterCache, CLUSTER_CACHE_DIR
+from classes.config_cache import load_cached_config
+from flows.helpers import safe_join
 
 async def get_cluster_cache(cluster_name: str):
     """Get cluster cache configuration for a specific cluster"""
     
-    # Check if the cluster cache config file exists (filename = cluster name)
-    path = f"config/clusterCache/{cluster_name}.json"
-    if not os.path.exists(path):
-        return ClusterCacheResponse(
-            success=False,
-            message=f"Cluster cache config file {cluster_name} does not exist"
-        )
-    
+    # The cluster cache config file is named after the cluster
     try:
-        with open(path, 'r') as f:
-            cluster_cache_data = json.load(f)
+        path = safe_join(CLUSTER_CACHE_DIR, f"{cluster_name}.json")
+        cluster_cache = load_cached_config(path, ClusterCache)
         
         return ClusterCacheResponse(
             success=True,
             message=f"Cluster cache config for {cluster_name} retrieved successfully",
-            cluster_cache_details=ClusterCacheDetails(
-                cluster=cluster_cache_data["cluster_cache_details"]["cluster"],
-                registry=cluster_cache_data["cluster_cache_details"]["registry"],
-                repo=cluster_cache_data["cluster_cache_details"]["repo"]
-            )
+            cluster_cache_details=cluster_cache.cluster_cache_details
         )
         
+    except FileNotFoundError:
+        return ClusterCacheResponse(
+            success=False,
+            message=f"Cluster cache config file {cluster_name} does not exist"
+        )
     except Exception as e:
         return ClusterCacheResponse(
             success=False,
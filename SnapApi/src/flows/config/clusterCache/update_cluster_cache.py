@@ -42,6 +42,10 @@ async def update_cluster_cache(request: ClusterCacheRequest):
     with open(path, "w") as f:
         json.dump(cluster_cache.to_dict(), f, indent=4)
     
+    # Let running SnapHooks pick up the new registry/repo on their next admission
+    from classes.snaphook import invalidate_snap_config_cache
+    invalidate_snap_config_cache(request.cluster)
+    
     return ClusterCacheResponse(
         success=True,
         message=f"Cluster cache config file {request.cluster} updated successfully"
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, validator
-from classes.clusterconfig import ClusterConfig, ClusterConfigDetails
+from pydantic import BaseModel
+from classes.clusterconfig import ClusterConfig, ClusterConfigDetails, Token
 from classes.cluster_cache_models import ClusterCacheRequest, ClusterCache
 from flows.config.clusterCache.create_cluster_cache import create_cluster_cache
 import os
@@ -9,16 +9,10 @@ import re
 
 class ClusterConfigRequest(BaseModel):
     kube_api_url: str
-    token: str
+    token: Token
     name: str
     registry: Optional[str] = None  # Registry name for cluster cache
     repo: Optional[str] = "snap_images"  # Repository name for cluster cache
-    
-    @validator('token')
-    def validate_token(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Token is required')
-        return v
 
 class ClusterConfigResponse(BaseModel):
     success: bool
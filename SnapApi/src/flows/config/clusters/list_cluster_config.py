@@ -25,29 +25,30 @@ async def list_cluster_config():
         )
     
     try:
-        for file in os.listdir(path):
-            if file.endswith(".json"):
-                #Read the json file
-                with open(os.path.join(path, file), "r") as f:
-                    try:
-                        data = json.load(f)
-                        cluster_details_data = data["cluster_config_details"]
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    #Read the json file
+                    with open(entry.path, "r") as f:
+                        try:
+                            data = json.load(f)
+                            cluster_details_data = data["cluster_config_details"]
                         
-                        # Create ClusterConfigDetails using model_construct to bypass all validation
-                        cluster_details = ClusterConfigDetails.model_construct(
-                            kube_api_url=cluster_details_data["kube_api_url"],
-                            token=cluster_details_data.get("token", cluster_details_data.get("kube_password", ""))
-                        )
+                            # Create ClusterConfigDetails using model_construct to bypass all validation
+                            cluster_details = ClusterConfigDetails.model_construct(
+                                kube_api_url=cluster_details_data["kube_api_url"],
+                                token=cluster_details_data.get("token", cluster_details_data.get("kube_password", ""))
+                            )
                         
-                        # Create ClusterConfig with the details
-                        config = ClusterConfig(
-                            cluster_config_details=cluster_details,
-                            name=data["name"]
-                        )
-                        cluster_configs.append(config)
-                        print(f"Successfully loaded cluster config: {data['name']}")
-                    except Exception as e:
-                        print(f"Error loading cluster config file {file}: {e}")
+                            # Create ClusterConfig with the details
+                            config = ClusterConfig(
+                                cluster_config_details=cluster_details,
+                                name=data["name"]
+                            )
+                            cluster_configs.append(config)
+                            print(f"Successfully loaded cluster config: {data['name']}")
+                        except Exception as e:
+                            print(f"Error loading cluster config file {entry.name}: {e}")
     except Exception as e:
         print(f"Error accessing cluster config directory {path}: {e}")
 
@@ -1,18 +1,12 @@
-from pydantic import BaseModel, validator
-from classes.clusterconfig import ClusterConfig, ClusterConfigDetails
+from pydantic import BaseModel
+from classes.clusterconfig import ClusterConfig, ClusterConfigDetails, Token
 import os
 import json
 
 class ClusterConfigRequest(BaseModel):
     kube_api_url: str
-    token: str
+    token: Token
     name: str
-    
-    @validator('token')
-    def validate_token(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Token is required')
-        return v
 
 class ClusterConfigResponse(BaseModel):
     success: bool
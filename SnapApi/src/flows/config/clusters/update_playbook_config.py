@@ -1,6 +1,12 @@
 from pydantic import BaseModel
 from typing import Optional
 import os
+import asyncio
+import tempfile
+from pathlib import Path
+from flows.helpers import safe_join
+
+PLAYBOOK_DIR = Path("playbook")
 
 class UpdatePlaybookRequest(BaseModel):
     filename: str
@@ -11,38 +17,58 @@ class UpdatePlaybookResponse(BaseModel):
     message: str
     filename: Optional[str] = None
 
+_NOT_YAML_RESPONSE = UpdatePlaybookResponse(
+    success=False,
+    message="Filename must end with .yaml",
+    filename=None
+)
+
+def _overwrite_existing_file(file_path: Path, content: str):
+    # Only existing playbooks may be updated; lstat raises FileNotFoundError otherwise
+    st = os.lstat(file_path)
+
+    # Write to a uniquely named sibling temp file and swap it in so readers never see a
+    # partial playbook and concurrent updates of the same file cannot clobber each other's temp.
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates 0600; keep the playbook's original permissions
+            os.fchmod(f.fileno(), st.st_mode & 0o777)
+            f.write(content.encode('utf-8'))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
 async def update_playbook_config(request: UpdatePlaybookRequest):
     try:
         # Validate filename ends with .yaml
         if not request.filename.endswith('.yaml'):
-            return UpdatePlaybookResponse(
-                success=False,
-                message="Filename must end with .yaml",
-                filename=None
-            )
+            return _NOT_YAML_RESPONSE
 
         # Construct full file path
-        file_path = os.path.join("playbook", request.filename)
+        file_path = safe_join(PLAYBOOK_DIR, request.filename)
 
-        # Check if file exists
-        if not os.path.exists(file_path):
+        # Write the new content to the file off the event loop
+        try:
+            await asyncio.to_thread(_overwrite_existing_file, file_path, request.content)
+        except FileNotFoundError:
             return UpdatePlaybookResponse(
                 success=False,
                 message=f"File {request.filename} does not exist",
                 filename=None
             )
 
-        # Write the new content to the file
-        with open(file_path, 'w') as f:
-            f.write(request.content)
-
         return UpdatePlaybookResponse(
             success=True,
             message=f"Successfully updated {request.filename}",
             filename=request.filename
         )
 
-    except Exception as e:
+    except (OSError, ValueError) as e:
         return UpdatePlaybookResponse(
             success=False,
             message=f"Error updating file: {str(e)}",
@@ -24,26 +24,27 @@ async def list_registry_config():
         )
     
     try:
-        for file in os.listdir(path):
-            if file.endswith(".json"):
-                #Read the json file
-                with open(os.path.join(path, file), "r") as f:
-                    try:
-                        data = json.load(f)
-                        # Create RegistryConfigDetails object first
-                        registry_details = RegistryConfigDetails(
-                            registry=data["registry_config_details"]["registry"],
-                            username=data["registry_config_details"]["username"],
-                            password=data["registry_config_details"]["password"]
-                        )
-                        # Create RegistryConfig with the details
-                        config = RegistryConfig(
-                            registry_config_details=registry_details,
-                            name=data["name"]
-                        )
-                        registry_configs.append(config)
-                    except Exception as e:
-                        print(f"Error loading registry config file {file}: {e}")
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    #Read the json file
+                    with open(entry.path, "r") as f:
+                        try:
+                            data = json.load(f)
+                            # Create RegistryConfigDetails object first
+                            registry_details = RegistryConfigDetails(
+                                registry=data["registry_config_details"]["registry"],
+                                username=data["registry_config_details"]["username"],
+                                password=data["registry_config_details"]["password"]
+                            )
+                            # Create RegistryConfig with the details
+                            config = RegistryConfig(
+                                registry_config_details=registry_details,
+                                name=data["name"]
+                            )
+                            registry_configs.append(config)
+                        except Exception as e:
+                            print(f"Error loading registry config file {entry.name}: {e}")
     except Exception as e:
         print(f"Error accessing registry config directory {path}: {e}")
         return RegistryConfigResponse(
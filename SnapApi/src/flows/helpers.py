@@ -2,12 +2,37 @@ import json
 import os
 import glob
 import re
+import time
+import base64
+import asyncio
 import logging
-from typing import Any, Dict, Optional, List
+from pathlib import Path
+from typing import Any, Dict, Optional, List, Tuple
+import urllib3
 from flows.proccess_utils import run
 
 logger = logging.getLogger(__name__)
 
+# Pooled client for registry manifest probes; TLS is not verified, as with skopeo --tls-verify=false
+_registry_http = urllib3.PoolManager(
+    num_pools=16,
+    maxsize=32,
+    cert_reqs="CERT_NONE",
+    retries=False,
+    timeout=urllib3.Timeout(connect=5.0, read=10.0),
+)
+_MANIFEST_ACCEPT = ", ".join((
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+))
+_AUTH_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+# (realm, service, scope, creds) -> (expires_at, bearer token)
+_registry_tokens: Dict[Tuple[str, str, str, str], Tuple[float, str]] = {}
+# registry host -> "http" once it turned out to speak plain HTTP; unknown hosts try "https" first
+_registry_schemes: Dict[str, str] = {}
+
 
 def _short_digest_from_full(full_digest: str) -> str:
     """
@@ -134,6 +159,17 @@ def normalize_registry_host(val: str) -> str:
     return val.lower()
 
 
+def safe_join(base_dir: Path, filename: str) -> Path:
+    """
+    Join filename onto base_dir, rejecting names that would escape it
+    (e.g. '../secrets.json' or 'a/../../b.json').
+    Raises ValueError for such names.
+    """
+    if not filename or os.path.basename(filename) != filename or filename in (".", ".."):
+        raise ValueError(f"Invalid file name: {filename}")
+    return base_dir / filename
+
+
 def find_registry_creds(registry_host: str, base_dir: str = "/app/config/registry") -> Optional[Dict[str, str]]:
     """
     Scan all JSON files in base_dir for a matching registry host.
@@ -277,10 +313,78 @@ def extract_app_name_from_pod(pod_name: str, labels: Dict[str, Any]) -> str:
     return app
 
 
+def _registry_authorization(challenge: str, creds: Optional[str]) -> Optional[str]:
+    """
+    Answer a registry WWW-Authenticate challenge with an Authorization header value.
+    Bearer tokens are cached until shortly before they expire. Returns None if the
+    challenge cannot be answered.
+    """
+    scheme, _, params = challenge.partition(" ")
+    scheme = scheme.lower()
+    basic = base64.b64encode(creds.encode("utf-8")).decode("ascii") if creds else None
+    if scheme == "basic":
+        return f"Basic {basic}" if basic else None
+    if scheme != "bearer":
+        return None
+
+    fields = dict(_AUTH_PARAM_RE.findall(params))
+    realm = fields.get("realm")
+    if not realm:
+        return None
+    key = (realm, fields.get("service", ""), fields.get("scope", ""), creds or "")
+    cached = _registry_tokens.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return f"Bearer {cached[1]}"
+
+    query = {name: value for name, value in (("service", key[1]), ("scope", key[2])) if value}
+    headers = {"Authorization": f"Basic {basic}"} if basic else {}
+    resp = _registry_http.request("GET", realm, fields=query, headers=headers)
+    if resp.status != 200:
+        return None
+    data = json.loads(resp.data)
+    token = data.get("token") or data.get("access_token")
+    if not token:
+        return None
+    expires_in = float(data.get("expires_in") or 60)
+    _registry_tokens[key] = (time.monotonic() + max(expires_in - 10, 0), token)
+    return f"Bearer {token}"
+
+
+def _registry_manifest_exists(registry_host: str, name: str, tag: str, creds: Optional[str]) -> Optional[bool]:
+    """
+    HEAD the manifest for name:tag on registry_host.
+    Returns True/False when the registry answers definitively, None otherwise.
+    """
+    scheme = _registry_schemes.get(registry_host, "https")
+    url = f"{scheme}://{registry_host}/v2/{name}/manifests/{tag}"
+    headers = {"Accept": _MANIFEST_ACCEPT}
+    try:
+        resp = _registry_http.request("HEAD", url, headers=headers)
+    except urllib3.exceptions.SSLError:
+        if scheme != "https":
+            raise
+        # Plain-HTTP registry (as skopeo --tls-verify=false also allows); remember it so
+        # later probes skip the failed TLS handshake
+        url = f"http://{registry_host}/v2/{name}/manifests/{tag}"
+        resp = _registry_http.request("HEAD", url, headers=headers)
+        _registry_schemes[registry_host] = "http"
+    if resp.status == 401:
+        authorization = _registry_authorization(resp.headers.get("WWW-Authenticate", ""), creds)
+        if authorization is None:
+            return None
+        headers["Authorization"] = authorization
+        resp = _registry_http.request("HEAD", url, headers=headers)
+    if resp.status == 200:
+        return True
+    if resp.status == 404:
+        return False
+    return None
+
+
 async def check_image_exists_multi_registry(registry_host: str, repo: str, cluster: str, namespace: str, app: str, digest: str, pod_hash: str) -> bool:
     """
-    Check if image exists using skopeo inspect command.
-    This replaces the previous curl-based registry-specific implementations.
+    Check if image exists with a HEAD on the registry's v2 manifest endpoint.
+    Falls back to skopeo inspect when the registry gives no definitive answer.
     """
     # Construct image path and tag (convert to lowercase for Docker registry compatibility)
     # This must match the logic in imagetag.py generate_tag() method
@@ -304,7 +408,7 @@ async def check_image_exists_multi_registry(registry_host: str, repo: str, clust
             password = cred_obj.get("password", "")
             if username or password:
                 creds = f"{username}:{password}"
-                print(f"Using registry credentials")
+                print("Using registry credentials")
         
         # Also check environment variables as fallback
         if not creds:
@@ -312,7 +416,20 @@ async def check_image_exists_multi_registry(registry_host: str, repo: str, clust
             env_password = os.getenv("snap_registry_pass", "")
             if env_username or env_password:
                 creds = f"{env_username}:{env_password}"
-                print(f"Using env credentials")
+                print("Using env credentials")
+        
+        # Probe the registry directly over pooled connections; no process spawn
+        image_name = f"{repo}/{image_path}" if repo else image_path
+        try:
+            exists = await asyncio.get_running_loop().run_in_executor(
+                None, _registry_manifest_exists, registry_host, image_name, tag, creds
+            )
+        except Exception as e:
+            logger.debug("SnapAPI: Registry manifest probe failed, falling back to skopeo: %s", e)
+            exists = None
+        if exists is not None:
+            logger.debug("SnapAPI: Image exists" if exists else "SnapAPI: Image not found")
+            return exists
         
         # Build skopeo command
         cmd = ["skopeo", "inspect", "--insecure-policy", "--tls-verify=false"]
@@ -325,10 +442,10 @@ async def check_image_exists_multi_registry(registry_host: str, repo: str, clust
         
         # If skopeo inspect succeeds (return code 0), the image exists
         if result.returncode == 0:
-            print(f"Image exists")
+            print("Image exists")
             return True
         else:
-            print(f"Image not found")
+            print("Image not found")
             return False
             
     except Exception as e:
@@ -387,27 +504,26 @@ def load_registry_config(registry_name: str) -> Dict[str, str]:
     }
 
 
-def load_cluster_config(cluster_name: str) -> str:
+def load_cluster_config(cluster_name: str):
     """
-    Load cluster configuration from /config/clusters/{cluster_name}.json
+    Load cluster credentials from /config/clusters/{cluster_name}.json
     
     Args:
         cluster_name: The cluster name to load configuration for
         
     Returns:
-        The kube API URL from cluster configuration
+        ClusterCredentials with the kube API URL and token
         
     Raises:
         ValueError: If cluster configuration is not found
     """
-    cluster_path = f"config/clusters/{cluster_name}.json"
-    if not os.path.exists(cluster_path):
-        raise ValueError(f"Cluster configuration not found: {cluster_name}")
-    
-    with open(cluster_path, 'r') as f:
-        cluster_data = json.load(f)
+    # Imported here to avoid a circular import with classes.clusterconfig
+    from classes.clusterconfig import load_cluster_credentials
     
-    return cluster_data["cluster_config_details"]["kube_api_url"]
+    try:
+        return load_cluster_credentials(cluster_name)
+    except FileNotFoundError:
+        raise ValueError(f"Cluster configuration not found: {cluster_name}")
 
 
 def get_snap_config_from_cluster_cache(cluster_cache: str) -> Dict[str, str]:
@@ -440,24 +556,16 @@ def get_snap_config_from_cluster_cache(cluster_cache: str) -> Dict[str, str]:
     # Load registry configuration
     registry_config = load_registry_config(registry_name)
     
-    # Load cluster configuration
-    kube_api_address = load_cluster_config(cluster_name)
-    
-    # Load cluster authentication details
-    cluster_config_path = f"config/clusters/{cluster_name}.json"
-    
-    with open(cluster_config_path, 'r') as f:
-        cluster_config_data = json.load(f)
-    
-    cluster_auth = cluster_config_data["cluster_config_details"]
+    # Load cluster API address and authentication details
+    credentials = load_cluster_config(cluster_name)
     
     return {
         "cache_registry": registry_config["registry"],
         "cache_registry_user": registry_config["username"],
         "cache_registry_pass": registry_config["password"],
         "cache_repo": cache_repo,
-        "kube_api_address": kube_api_address,
-        "token": cluster_auth.get("token", "")
+        "kube_api_address": credentials.kube_api_url,
+        "token": credentials.token
     }
 
 
@@ -498,24 +606,14 @@ async def get_snap_config_from_cluster_cache_api(cluster_cache: str) -> Dict[str
     # Load registry configuration
     registry_config = load_registry_config(registry_name)
     
-    # Load cluster configuration
-    kube_api_address = load_cluster_config(cluster_name)
-    
-    # Load cluster authentication details
-    cluster_data = load_cluster_cache_config(cluster_cache)
-    cluster_name_from_cache = cluster_data["cluster_cache_details"]["cluster"]
-    cluster_config_path = f"config/clusters/{cluster_name_from_cache}.json"
-    
-    with open(cluster_config_path, 'r') as f:
-        cluster_config_data = json.load(f)
-    
-    cluster_auth = cluster_config_data["cluster_config_details"]
+    # Load cluster API address and authentication details
+    credentials = load_cluster_config(cluster_name)
     
     return {
         "cache_registry": registry_config["registry"],
         "cache_registry_user": registry_config["username"],
         "cache_registry_pass": registry_config["password"],
         "cache_repo": cache_repo,
-        "kube_api_address": kube_api_address,
-        "token": cluster_auth.get("token", "")
+        "kube_api_address": credentials.kube_api_url,
+        "token": credentials.token
     }
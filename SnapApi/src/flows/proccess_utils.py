@@ -1,26 +1,40 @@
 import asyncio
 import shlex
 
-async def run(command, check=True, capture_output=True, text=True):
+# Flags whose following argument is a credential and must not be logged
+SECRET_FLAGS = frozenset({"--password", "--token", "--creds"})
+
+def redact_command(command):
+    """Return a copy of the command with credential arguments masked."""
+    redacted = []
+    hide_next = False
+    for arg in command:
+        redacted.append("****" if hide_next else str(arg))
+        hide_next = arg in SECRET_FLAGS
+    return redacted
+
+async def run(command, check=True, capture_output=True, text=True, input=None):
     print("--------------------------------")
     print(f"Running command: \n")
     # Convert the command array to a shell-quoted string for easy copy-paste
-    cmd_str = ' '.join(shlex.quote(str(arg)) for arg in command)
+    safe_command = redact_command(command)
+    cmd_str = ' '.join(shlex.quote(arg) for arg in safe_command)
     print(f"{cmd_str}")
     print("--------------------------------")
     
     try:
         process = await asyncio.create_subprocess_exec(
             *command,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
             stdout=asyncio.subprocess.PIPE if capture_output else None,
             stderr=asyncio.subprocess.PIPE if capture_output else None
         )
         
-        stdout, stderr = await process.communicate()
+        stdout, stderr = await process.communicate(input)
         
         if check and process.returncode != 0:
             raise RuntimeError(
-                f"Command '{' '.join(command)}' failed with error: {stderr.decode() if stderr else ''}"
+                f"Command '{' '.join(safe_command)}' failed with error: {stderr.decode() if stderr else ''}"
             )
             
         if text and capture_output:
@@ -35,7 +49,7 @@ async def run(command, check=True, capture_output=True, text=True):
         )
         
     except Exception as e:
-        raise RuntimeError(f"Command '{' '.join(command)}' failed with error: {str(e)}")
+        raise RuntimeError(f"Command '{' '.join(safe_command)}' failed with error: {str(e)}")
 
 class AsyncProcessResult:
     def __init__(self, returncode, stdout, stderr, args):
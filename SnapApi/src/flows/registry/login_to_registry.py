@@ -35,11 +35,11 @@ async def login_to_registry(registry_config_name: str):
             "login",
             registry_config.registry,
             "--username", registry_config.username,
-            "--password", registry_config.password,
+            "--password-stdin",
             "--tls-verify=false"
         ]
-        # Execute the command using the run helper function
-        await run(command, capture_output=True, text=True, check=True)
+        # Execute the command using the run helper function, passing the password on stdin
+        await run(command, capture_output=True, text=True, check=True, input=(registry_config.password + "\n").encode())
 
         return {"message": f"Successfully logged in to {registry_config.registry}"}
 
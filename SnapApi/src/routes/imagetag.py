@@ -1,12 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from classes.imagetag import generate_image_tag, parse_image_tag, get_image_component, ImageTagComponents
+from classes.imagetag import generate_image_tag, parse_image_tag, get_image_component, ImageTagComponentsRequest
 
 router = APIRouter()
 
 # Image Tag Routes
 
 @router.post("/generate")
-async def generate_image_tag_endpoint(request: ImageTagComponents):
+async def generate_image_tag_endpoint(request: ImageTagComponentsRequest):
     """
     Generate an image tag from individual components.
     Returns format: <registry>/<repo>/<cluster>-<namespace>-<app>:<origImageShortDigest>-<PodTemplateHash>
@@ -23,7 +23,7 @@ async def generate_image_tag_endpoint(request: ImageTagComponents):
         )
         return {
             "success": True,
-            "components": request.dict(),
+            "components": request.model_dump(),
             "generated_image_tag": image_tag
         }
     except ValueError as e:
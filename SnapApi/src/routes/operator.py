@@ -95,7 +95,8 @@ def run_operator(namespace=None):
         
         if namespace:
             log_info(logger, 'SnapApi', 'Operator Start', f'Starting operator with namespace scope: {namespace}')
-            kopf.run(namespace=namespace)
+            # Scopes the apiserver watch itself, so pods elsewhere never reach the handler
+            kopf.run(namespaces=[namespace])
         else:
             log_info(logger, 'SnapApi', 'Operator Start', f'Starting operator with cluster-wide scope')
             kopf.run(clusterwide=True)
@@ -2,6 +2,7 @@ from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 from typing import Dict
 from datetime import datetime
+import orjson
 
 active_connections: Dict[str, WebSocket] = {}
 
@@ -38,11 +39,16 @@ async def disconnect(username: str):
 
         # print(f"User {username} disconnected.")
 
-async def send_progress(username: str, data: dict):
-    """Send a message to a specific user if they are connected."""
+def _stamp_progress(data: dict) -> dict:
+    """Mark a message as a progress event and add its timestamp."""
     data["type"] = "progress"
     # Add timestamp to the data structure (not to the message)
     data["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return data
+
+async def send_progress(username: str, data: dict):
+    """Send a message to a specific user if they are connected."""
+    _stamp_progress(data)
 
     if username in active_connections:
         try:
@@ -54,11 +60,40 @@ async def send_progress(username: str, data: dict):
     
     print(f"Websocket {username} not found")
 
+async def send_progress_many(username: str, events: list):
+    """Send several progress messages to a user as a single JSON array frame."""
+    if username not in active_connections:
+        print(f"Websocket {username} not found")
+        return
+
+    payload = orjson.dumps([_stamp_progress(data) for data in events]).decode()
+    try:
+        await active_connections[username].send_text(payload)
+        return {"status": "success", "message": f"Sent to {username}"}
+    except Exception as e:
+        active_connections.pop(username, None)  # Remove disconnected users
+        return {"status": "error", "message": f"Failed to send to {username}: {str(e)}"}
+
+class ProgressEmitter:
+    """Buffers progress messages for one user and task, sending them together on flush."""
+
+    def __init__(self, username: str, task_name: str):
+        self.username = username
+        self.task_name = task_name
+        self.pending = []
+
+    def emit(self, progress, message: str):
+        self.pending.append({"progress": progress, "task_name": self.task_name, "message": message})
+
+    async def flush(self):
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        await send_progress_many(self.username, events)
+
 async def broadcast_progress(data: dict):
     """Send a message to all connected users."""
-    data["type"] = "progress"
-    # Add timestamp to the data structure (not to the message)
-    data["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _stamp_progress(data)
 
     # Send to all connected users
     disconnected_users = []
@@ -75,3 +110,19 @@ async def broadcast_progress(data: dict):
     
     return {"status": "success", "message": f"Broadcasted to {len(active_connections)} users"}
 
+async def broadcast_progress_many(events: list):
+    """Send several progress messages to all connected users as a single JSON array frame."""
+    payload = orjson.dumps([_stamp_progress(data) for data in events]).decode()
+
+    disconnected_users = []
+    for username, websocket in active_connections.items():
+        try:
+            await websocket.send_text(payload)
+        except Exception as e:
+            print(f"SnapAPI: Failed to send to {username}: {str(e)}")
+            disconnected_users.append(username)
+
+    for username in disconnected_users:
+        active_connections.pop(username, None)
+
+    return {"status": "success", "message": f"Broadcasted to {len(active_connections)} users"}
@@ -39,8 +39,7 @@ export const LogsProvider = ({ children }) => {
       startPing(ws);
     };
 
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
+    const handleMessage = (data) => {
       if (data.type === "pong") {
         console.log("Received pong from server");
         return;
@@ -90,6 +89,12 @@ export const LogsProvider = ({ children }) => {
       }
     };
 
+    ws.onmessage = (event) => {
+      const parsed = JSON.parse(event.data);
+      // Progress updates may arrive batched as a JSON array of messages
+      (Array.isArray(parsed) ? parsed : [parsed]).forEach(handleMessage);
+    };
+
     ws.onclose = () => {
       console.log("WebSocket disconnected. Attempting to reconnect...");
       stopPing();